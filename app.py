@@ -1,10 +1,11 @@
 import streamlit as st
-import time
-import math
-import random
+from kernel.checkpoint import CHECKPOINT_PATH, CheckpointError
 from kernel.state_manager import get_state
-from kernel.simulation_engine import BotThread, start_hub_listener
-from interface.ui_components import CYBERPUNK_CSS, render_radar_graph, style_log_dataframe
+from kernel.packet_queue import POLICIES
+from protocols.core import SIGNATURE_SCHEMES
+from kernel.metrics import METRICS, METRICS_PORT
+from kernel.simulation_engine import deploy_units, start_fleet_scheduler, start_hub_listener, start_metrics_server, start_shards, start_capture, stop_capture, save_checkpoint, restore_checkpoint
+from interface.ui_components import CYBERPUNK_CSS, cached_render, render_radar_graph, style_log_dataframe
 
 st.set_page_config(
     page_title="Crisscross: Lattice Network Monitor",
@@ -16,6 +17,7 @@ st.set_page_config(
 st.markdown(CYBERPUNK_CSS, unsafe_allow_html=True)
 
 STATE = get_state()
+start_fleet_scheduler()
 start_hub_listener()
 
 st.sidebar.header("🕹️ COMMAND PROTOCOLS")
@@ -30,6 +32,7 @@ STATE.jitter = st.sidebar.slider("Signal Jitter (Latency)", 0.0, 2.0, 0.0)
 
 st.sidebar.subheader("Physics & Hardware")
 STATE.max_range = st.sidebar.slider("Signal Horizon (Range)", 5.0, 30.0, 15.0)
+STATE.link_range = st.sidebar.slider("Mesh Link Range", 0.0, 15.0, 6.0)
 STATE.batt_drain_mod = st.sidebar.slider("Battery Drain Rate", 0.1, 5.0, 1.0)
 
 STATE.packet_types = st.sidebar.multiselect(
@@ -39,56 +42,170 @@ STATE.packet_types = st.sidebar.multiselect(
 )
 STATE.auto_revive = st.sidebar.checkbox("Auto-Revive Protocol", value=False)
 
+st.sidebar.subheader("Hub Pipeline")
+STATE.auth_mode = st.sidebar.selectbox(
+    "Packet Authentication",
+    ["signature", "session"],
+    format_func=lambda m: "Per-Packet Signature" if m == "signature" else "Session MAC (Handshake)"
+)
+STATE.wire_format = st.sidebar.selectbox(
+    "Wire Format",
+    ["binary", "json"],
+    format_func=lambda f: "Binary Frames" if f == "binary" else "JSON (Debug)"
+)
+STATE.bundle_size = st.sidebar.slider("Payloads per Bundle", 1, 32, 1)
+STATE.bundle_window = st.sidebar.slider("Bundle Window (s)", 0.5, 10.0, 2.0)
+STATE.hub_workers = st.sidebar.slider("Verification Workers", 1, 16, 2)
+STATE.hub_batch_size = st.sidebar.slider("Verify Batch Size", 1, 64, 16)
+STATE.packet_queue.capacity = st.sidebar.slider("Queue Capacity", 64, 8192, 2048, step=64)
+STATE.packet_queue.policy = st.sidebar.selectbox(
+    "Overflow Policy",
+    POLICIES,
+    index=POLICIES.index("drop-lowest"),
+    format_func=lambda p: {"drop-oldest": "Drop Oldest", "drop-lowest": "Drop Lowest Priority", "block": "Block Sender"}[p]
+)
+
+STATE.admission.enabled = st.sidebar.checkbox("Admission Control", value=True, key="admission_control")
+STATE.admission.rate = st.sidebar.slider("Per-Unit Rate Limit (pkt/s)", 1.0, 50.0, 10.0)
+STATE.admission.threshold = st.sidebar.slider("Quarantine Threshold", 0.1, 1.0, 0.5)
+
+hub_shards = st.sidebar.number_input("Hub Shards (0 = in-process)", 0, 16, STATE.shards.count if STATE.shards else 0)
+if hub_shards != (STATE.shards.count if STATE.shards else 0):
+    with st.spinner(f"Starting {hub_shards} hub processes..." if hub_shards else "Stopping hub processes..."):
+        start_shards(hub_shards)
+
+with st.sidebar.expander("Worker Throughput"):
+    worker_stats = STATE.hub_pool.throughput()
+    if STATE.shards is not None:
+        for shard in STATE.shards.stats():
+            st.text(f"Shard {shard['shard']} (pid {shard['pid']}{'' if shard['alive'] else ', dead'}): {shard['results']}/{shard['sent']} pkts, {shard['lost']} lost")
+    elif worker_stats:
+        for worker, (count, rate) in worker_stats.items():
+            st.text(f"{worker}: {count} pkts | {rate:.1f}/s")
+    else:
+        st.caption("Idle")
+
+with st.sidebar.expander("Replay Guard"):
+    replay_stats = STATE.replay_guard.stats()
+    st.text(f"Duplicates blocked: {replay_stats['duplicates']}")
+    st.text(f"Packets checked: {replay_stats['checked']}")
+    st.text(f"Tracked digests: {replay_stats['tracked']}")
+    st.text(f"Memory: {replay_stats['memory_bytes'] / 1024:.0f} KiB (fixed)")
+
+with st.sidebar.expander("Peer Key Directory"):
+    peer_stats = STATE.hub_node.vault.peers.stats()
+    st.text(f"Cached identities: {peer_stats['entries']}")
+    st.text(f"Hits / misses: {peer_stats['hits']} / {peer_stats['misses']}")
+    st.text(f"Evictions: {peer_stats['evictions']}")
+
+with st.sidebar.expander("Signature Rules"):
+    st.text(f"{len(STATE.rules.rules)} rules from {STATE.rules.path}")
+    if STATE.rules.error:
+        st.error(f"Reload failed, keeping previous rules: {STATE.rules.error}")
+    if st.button("Reload Rules"):
+        STATE.rules.reload()
+
+st.sidebar.subheader("Instrumentation")
+METRICS.enabled = st.sidebar.checkbox("Stage Latency Metrics", value=METRICS.enabled, key="stage_metrics")
+if METRICS.enabled and start_metrics_server():
+    st.sidebar.caption(f"Prometheus: http://127.0.0.1:{METRICS_PORT}/metrics")
+
+capture_path = st.sidebar.text_input("Capture File", value="captures/traffic.cap")
+if st.sidebar.checkbox("Capture Traffic", key="capture_traffic"):
+    capture = start_capture(capture_path)
+    st.sidebar.caption(f"{capture.packets} packets → {capture.path}")
+elif STATE.capture is not None:
+    stop_capture()
+
+with st.sidebar.expander("Stage Latency"):
+    if METRICS.enabled:
+        st.dataframe(
+            [
+                {"Stage": stage, "Count": s["count"], "p50 ms": s["p50_us"] / 1000, "p99 ms": s["p99_us"] / 1000, "Max ms": s["max_us"] / 1000}
+                for stage, s in METRICS.summary().items()
+            ],
+            hide_index=True
+        )
+        if st.button("Reset Histograms"):
+            METRICS.reset()
+    else:
+        st.caption("Disabled")
+
 st.sidebar.subheader("Deployment")
-n_count = st.sidebar.number_input("Unit Count", 1, 50, 8)
+n_count = st.sidebar.number_input("Unit Count", 1, 10000, 8)
+STATE.signature_scheme = st.sidebar.selectbox(
+    "Signature Scheme",
+    list(SIGNATURE_SCHEMES),
+    index=list(SIGNATURE_SCHEMES).index(STATE.signature_scheme)
+)
 
 if st.sidebar.button("DEPLOY UNITS"):
-    with STATE.lock:
-        current_count = len(STATE.nodes)
-        for i in range(current_count, n_count):
-            nid = f"Unit-{i+1:02d}"
+    deploy_units(n_count)
 
-            angle = random.uniform(0, 2 * math.pi)
-            radius = random.uniform(2, STATE.max_range * 0.8)
-            x, y = radius * math.cos(angle), radius * math.sin(angle)
-
-            bot = BotThread(nid, x, y)
-            STATE.nodes[nid] = bot
-            bot.start()
+checkpoint_path = st.sidebar.text_input("Checkpoint File", value=CHECKPOINT_PATH)
+c_save, c_restore = st.sidebar.columns(2)
+if c_save.button("💾 SAVE", disabled=not STATE.nodes):
+    st.sidebar.success(f"Saved {save_checkpoint(checkpoint_path)} units")
+if c_restore.button("♻️ RESTORE", disabled=bool(STATE.nodes)):
+    try:
+        st.sidebar.success(f"Restored {restore_checkpoint(checkpoint_path)} units")
+    except CheckpointError as e:
+        st.sidebar.error(f"Restore failed: {e}")
 
 st.title("🛡️ CATENATE UNION")
 
-c1, c2, c3, c4 = st.columns(4)
+# Each region refreshes on its own timer while the system runs; a full
+# script rerun only happens on sidebar interaction.
+METRICS_REFRESH = 1.0
+RADAR_REFRESH = 0.8
+INSPECTOR_REFRESH = 2.0
+TRAFFIC_REFRESH = 1.5
 
-with STATE.lock:
-    active_count = sum(1 for n in STATE.nodes.values() if n.alive)
-    total_nodes = max(1, len(STATE.nodes))
-    nodes_snapshot = STATE.nodes.copy()
+def refresh(seconds):
+    return seconds if STATE.is_running else None
 
-c1.metric("NETWORK INTEGRITY", f"{int((active_count/total_nodes)*100)}%")
-c2.metric("PACKET QUEUE", STATE.packet_queue.qsize())
-c3.metric("ENTROPY LEVEL", f"{int(STATE.hack_prob * 100)}%")
-c4.metric("SYSTEM STATUS", "ONLINE" if STATE.is_running else "STANDBY")
+@st.fragment(run_every=refresh(METRICS_REFRESH))
+def metrics_panel():
+    c1, c2, c3, c4 = st.columns(4)
 
-col_graph, col_controls = st.columns([3, 1])
+    fleet_view = STATE.snapshot.fleet
+    active_count = int(fleet_view.alive.sum())
+    total_nodes = max(1, len(fleet_view.ids))
 
-with col_graph:
-    fig = render_radar_graph(nodes_snapshot, STATE.max_range)
+    c1.metric("NETWORK INTEGRITY", f"{int((active_count/total_nodes)*100)}%")
+    queue_stats = STATE.packet_queue.stats()
+    c2.metric("PACKET QUEUE", STATE.packet_queue.qsize())
+    c2.caption(
+        " · ".join(f"{t} {queue_stats['depth'].get(p, 0)}/{queue_stats['dropped'].get(p, 0)}" for t, p in STATE.packet_priorities.items())
+        + f" (queued/dropped) · refused {queue_stats['refused']}"
+    )
+    c3.metric("ENTROPY LEVEL", f"{int(STATE.hack_prob * 100)}%")
+    c4.metric("SYSTEM STATUS", "ONLINE" if STATE.is_running else "STANDBY")
+
+@st.fragment(run_every=refresh(RADAR_REFRESH))
+def radar_panel():
+    snapshot = STATE.snapshot
+    max_range = STATE.max_range
+    selected = st.session_state.get("inspected_unit")
+    fig = cached_render(("radar", selected), (snapshot.fleet_version, max_range), lambda: render_radar_graph(snapshot.fleet, max_range, selected))
     st.plotly_chart(fig, use_container_width=True, config={'staticPlot': True})
 
-with col_controls:
+@st.fragment(run_every=refresh(INSPECTOR_REFRESH))
+def inspector_panel():
     st.subheader("📡 Unit Inspector")
-    if nodes_snapshot:
-        sel_id = st.selectbox("Select Unit", list(nodes_snapshot.keys()))
-        unit = nodes_snapshot[sel_id]
+    fleet_view = STATE.snapshot.fleet
+    if fleet_view.ids:
+        sel_idx = st.selectbox("Select Unit", range(len(fleet_view.ids)), format_func=lambda i: fleet_view.ids[i])
+        st.session_state.inspected_unit = fleet_view.ids[sel_idx]
+        unit = STATE.nodes[fleet_view.ids[sel_idx]]
 
         st.markdown(f"""
-        **ID:** `{unit.node_id}`  
-        **STATUS:** `{'ALIVE' if unit.alive else 'KIA'}`  
-        **COORDS:** `{unit.x:.2f}, {unit.y:.2f}`
+        **ID:** `{fleet_view.ids[sel_idx]}`  
+        **STATUS:** `{'ALIVE' if fleet_view.alive[sel_idx] else 'KIA'}`  
+        **COORDS:** `{fleet_view.x[sel_idx]:.2f}, {fleet_view.y[sel_idx]:.2f}`
         """)
         
-        batt_val = int(max(0, unit.battery))
+        batt_val = int(max(0, fleet_view.battery[sel_idx]))
         
         bar_color = "red" if batt_val < 20 else "green"
         st.progress(batt_val, text=f"Battery: {batt_val}%")
@@ -100,24 +217,66 @@ with col_controls:
             unit.alive = True
             unit.battery = 100.0
             
-        unit.is_compromised = st.toggle("Compromise Protocol", value=unit.is_compromised)
+        unit.is_compromised = st.toggle("Compromise Protocol", value=bool(fleet_view.compromised[sel_idx]))
+
+        admission = STATE.admission.stats(unit.node_id, STATE.clock.time())
+        st.markdown(f"""
+        **ADMITTED:** `{admission['admitted']}`  
+        **SHED:** `{admission['shed_rate']} rate / {admission['shed_quarantine']} quarantine / {admission['shed_forged']} forged-ID`  
+        **BAD SIGNATURES UNDER THIS ID:** `{admission['forged']}`  
+        **OFFENCE SCORE:** `{admission['score']:.2f}`
+        """)
+        if admission["quarantine_left"]:
+            st.warning(f"Quarantined for {admission['quarantine_left']:.0f}s (strike {admission['strikes']})")
     else:
         st.info("No Units Deployed")
 
-st.subheader("🖥️ DECRYPTED NETWORK TRAFFIC")
-
-if STATE.logs:
-    with STATE.lock:
-        logs_snapshot = list(STATE.logs)
-    
-    styled_df = style_log_dataframe(logs_snapshot)
-    st.dataframe(
-        styled_df, 
-        use_container_width=True, 
-        height=250,
-        hide_index=True
+TRAFFIC_PAGE_SIZE = 50
+TRAFFIC_WINDOWS = {"All Time": None, "Last Minute": 60, "Last 10 Minutes": 600, "Last Hour": 3600}
+
+@st.fragment(run_every=refresh(TRAFFIC_REFRESH))
+def traffic_panel():
+    st.subheader("🖥️ DECRYPTED NETWORK TRAFFIC")
+
+    f_sender, f_type, f_status, f_window, f_page = st.columns([2, 2, 2, 2, 1])
+    sender = f_sender.selectbox("Sender", ["All"] + list(STATE.snapshot.fleet.ids) + ["CENTRAL_HUB", "UNKNOWN"])
+    type_ = f_type.selectbox("Type", ["All", "INTEL", "BIO", "CHAT", "CRYPTO", "SEC", "MALWARE"])
+    status = f_status.selectbox("Status", ["All", "VERIFIED", "BLOCKED", "REJECTED", "CRITICAL"])
+    window_label = f_window.selectbox("Window", list(TRAFFIC_WINDOWS))
+    window = TRAFFIC_WINDOWS[window_label]
+
+    filters = dict(
+        sender=None if sender == "All" else sender,
+        type_=None if type_ == "All" else type_,
+        status=None if status == "All" else status,
+        since=None if window is None else STATE.clock.time() - window,
     )
+    total = STATE.log_store.count(**filters)
+    pages = max(1, -(-total // TRAFFIC_PAGE_SIZE))
+    page = f_page.number_input("Page", 1, pages, 1)
+    st.caption(f"{total} matching entries · page {page} of {pages}")
+
+    key = (tuple(filters.values()) if window is None else (sender, type_, status, window_label), page)
+    logs = cached_render(("traffic", key), STATE.log_store.version, lambda: STATE.log_store.query(
+        limit=TRAFFIC_PAGE_SIZE, offset=(page - 1) * TRAFFIC_PAGE_SIZE, **filters
+    ))
+    if logs:
+        styled_df = cached_render(("traffic_style", key), STATE.log_store.version, lambda: style_log_dataframe(logs))
+        st.dataframe(
+            styled_df, 
+            use_container_width=True, 
+            height=250,
+            hide_index=True
+        )
+
+metrics_panel()
+
+col_graph, col_controls = st.columns([3, 1])
+
+with col_graph:
+    radar_panel()
+
+with col_controls:
+    inspector_panel()
 
-if STATE.is_running:
-    time.sleep(0.8)
-    st.rerun()
\ No newline at end of file
+traffic_panel()
@@ -0,0 +1,18 @@
+import time
+
+def measure(fn, seconds=0.5, min_runs=3):
+    runs = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while runs < min_runs or time.perf_counter() < deadline:
+        fn()
+        runs += 1
+    elapsed = time.perf_counter() - start
+    return {"ops_per_sec": runs / elapsed, "mean_us": elapsed / runs * 1e6, "runs": runs}
+
+def measure_batch(fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    elapsed = time.perf_counter() - start
+    return {"ops_per_sec": len(items) / elapsed, "mean_us": elapsed / len(items) * 1e6, "runs": len(items)}
@@ -0,0 +1,60 @@
+import argparse
+import time
+from cryptography.fernet import Fernet
+from protocols.core import DEFAULT_SIGNATURE_SCHEME, SIGNATURE_SCHEMES
+from protocols.wire import encode_frame
+from kernel.shards import ShardedHub
+
+def build_traffic(scheme_name, senders, packets):
+    scheme = SIGNATURE_SCHEMES[scheme_name]
+    network_key = Fernet.generate_key()
+    cipher = Fernet(network_key)
+    keys = [scheme.generate() for _ in range(senders)]
+    peers = [(f"Unit-{slot + 1:02d}", slot, priv.public_key()) for slot, priv in enumerate(keys)]
+    signed = []
+    for n in range(packets):
+        slot = n % senders
+        token = cipher.encrypt(f'{{"type": "INTEL", "content": "bench {n}"}}'.encode("utf-8"))
+        signed.append((slot, token, scheme.sign(keys[slot], token)))
+    return network_key, peers, signed
+
+def stamp(signed):
+    # Timestamps are not signed, so frames are stamped just before each run to pass the freshness check.
+    now = time.time()
+    return [encode_frame(slot, now + n * 1e-6, token, sig) for n, (slot, token, sig) in enumerate(signed)]
+
+def run(count, scheme_name, network_key, peers, signed, chunk=64):
+    received = []
+    hub = ShardedHub(count, network_key, scheme_name, lambda slot: peers[slot][0], received.extend).start()
+    try:
+        hub.register_peers(peers)
+        traffic = stamp(signed)
+        start = time.perf_counter()
+        for i in range(0, len(traffic), chunk):
+            hub.submit(traffic[i:i + chunk])
+        while hub.pending():
+            time.sleep(0.001)
+        elapsed = time.perf_counter() - start
+    finally:
+        hub.stop()
+    verified = sum(1 for row in received if row[2] == "VERIFIED")
+    return {"packets_per_sec": len(traffic) / elapsed, "verified": verified, "per_shard": [s["results"] for s in hub.stats()]}
+
+def main():
+    parser = argparse.ArgumentParser(description="Hub throughput against the number of shard processes")
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--senders", type=int, default=64)
+    parser.add_argument("--packets", type=int, default=4000)
+    parser.add_argument("--scheme", choices=list(SIGNATURE_SCHEMES), default=DEFAULT_SIGNATURE_SCHEME)
+    args = parser.parse_args()
+
+    network_key, peers, signed = build_traffic(args.scheme, args.senders, args.packets)
+    results = {count: run(count, args.scheme, network_key, peers, signed) for count in args.shards}
+    baseline = results[args.shards[0]]["packets_per_sec"]
+
+    print(f"{'SHARDS':<8} {'PKTS/s':>10} {'SCALING':>8} {'VERIFIED':>9}  PER SHARD")
+    for count, r in results.items():
+        print(f"{count:<8} {r['packets_per_sec']:>10.0f} {r['packets_per_sec'] / baseline:>7.1f}x {r['verified']:>9}  {r['per_shard']}")
+
+if __name__ == "__main__":
+    main()
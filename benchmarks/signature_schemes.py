@@ -0,0 +1,32 @@
+import argparse
+from protocols.core import SIGNATURE_SCHEMES
+from .harness import measure
+
+def compare(seconds=1.0, payload_size=256):
+    message = b"x" * payload_size
+    results = {}
+    for name, scheme in SIGNATURE_SCHEMES.items():
+        priv = scheme.generate()
+        pub = priv.public_key()
+        sig = scheme.sign(priv, message)
+        results[name] = {
+            "sign": measure(lambda: scheme.sign(priv, message), seconds)["ops_per_sec"],
+            "verify": measure(lambda: scheme.verify(pub, sig, message), seconds)["ops_per_sec"],
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Side-by-side signature scheme throughput")
+    parser.add_argument("--seconds", type=float, default=1.0)
+    parser.add_argument("--payload-size", type=int, default=256)
+    args = parser.parse_args()
+
+    results = compare(args.seconds, args.payload_size)
+    baseline = results["rsa-pss"]["verify"]
+
+    print(f"{'SCHEME':<10} {'SIGN/s':>12} {'VERIFY/s':>12} {'HUB GAIN':>10}")
+    for name, r in results.items():
+        print(f"{name:<10} {r['sign']:>12.0f} {r['verify']:>12.0f} {r['verify'] / baseline:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
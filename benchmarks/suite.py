@@ -0,0 +1,198 @@
+import argparse
+import base64
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import numpy as np
+from .harness import measure, measure_batch
+
+PAYLOAD_SIZES = (64, 1024, 16384)
+FLEET_SIZES = (10, 100, 1000, 10000)
+HUB_PACKETS = 1000
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+def bench_crypto(seconds):
+    from cryptography.fernet import Fernet
+    from protocols.core import CryptoVault
+
+    vault = CryptoVault("BENCH_NODE", Fernet.generate_key())
+    pem = vault.get_public_key_str()
+    results = {}
+    for size in PAYLOAD_SIZES:
+        payload = {"type": "INTEL", "content": "x" * size}
+        token = vault.encrypt_payload(payload)
+        sig = vault.sign_message(token)
+        results[f"crypto.encrypt.{size}"] = measure(lambda: vault.encrypt_payload(payload), seconds)
+        results[f"crypto.decrypt.{size}"] = measure(lambda: vault.decrypt_payload(token), seconds)
+        results[f"crypto.sign.{size}"] = measure(lambda: vault.sign_message(token), seconds)
+        results[f"crypto.verify.{size}"] = measure(lambda: vault.verify_signature(token, sig, "BENCH_NODE", pem), seconds)
+    return results
+
+def bench_packets(seconds):
+    from cryptography.fernet import Fernet
+    from protocols.core import DataPacket
+
+    token = Fernet(Fernet.generate_key()).encrypt(b'{"type": "CHAT", "content": "Roger that, moving to waypoint."}').decode('utf-8')
+    fields = dict(sender_id="Unit-01", timestamp=str(time.time()), encrypted_payload=token, signature="A" * 344)
+    packet = DataPacket(**fields)
+    return {
+        "packet.construct": measure(lambda: DataPacket(**fields), seconds),
+        "packet.to_json": measure(packet.to_json, seconds),
+    }
+
+def bench_hub(count=HUB_PACKETS):
+    from protocols.core import DataPacket
+    from protocols.wire import encode_frame
+    from kernel.simulation_engine import STATE, BotThread, HubListener, PacketFactory
+
+    bots = []
+    for i in range(4):
+        bot = BotThread(f"Bench-{i + 1:02d}", 1.0, 1.0)
+        STATE.nodes[bot.node_id] = bot
+        bots.append(bot)
+
+    packets, frames = [], []
+    for i in range(count):
+        bot = bots[i % len(bots)]
+        p_type = STATE.rng.choice(STATE.packet_types)
+        encrypted = bot.node_logic.vault.encrypt_payload_bytes({"type": p_type, "content": PacketFactory.generate(p_type, i % 10 == 0, STATE.rng)})
+        sig = bot.node_logic.vault.sign_bytes(encrypted)
+        now = STATE.clock.time()
+        packets.append(DataPacket(
+            sender_id=bot.node_id,
+            timestamp=str(now),
+            encrypted_payload=encrypted.decode('utf-8'),
+            signature=base64.b64encode(sig).decode('utf-8')
+        ))
+        frames.append(encode_frame(bot.slot, now, encrypted, sig))
+
+    # process() runs verify + classify inline; the simulated link latency lives in transit().
+    listener = HubListener()
+    return {
+        "hub.process": measure_batch(listener.process, packets),
+        "hub.process.binary": measure_batch(lambda frame: listener.process(listener.receive(frame)), frames),
+    }
+
+def synthetic_fleet(n, rng):
+    from kernel.fleet_store import FleetView
+
+    x, y = rng.uniform(-25, 25, (2, n))
+    hops = rng.integers(0, 4, n).astype(np.int16)
+    next_hop = np.where(hops == 0, -2, np.where(hops == 1, -1, rng.integers(0, n, n))).astype(np.int32)
+    return FleetView(
+        tuple(f"Unit-{i + 1:02d}" for i in range(n)),
+        x, y,
+        rng.uniform(0, 100, n),
+        rng.random(n) > 0.1,
+        rng.random(n) < 0.05,
+        rng.random(n) < 0.2,
+        np.hypot(x, y),
+        np.hypot(x, y) <= 15.0,
+        next_hop,
+        hops,
+    )
+
+def synthetic_logs(n, rng):
+    statuses = ["VERIFIED", "BLOCKED", "CRITICAL", "REJECTED"]
+    return [
+        {"Time": "12:00:00", "ID": f"Unit-{i % 99 + 1:02d}", "Type": "CHAT", "Payload": "Roger that, moving to waypoint.", "Status": statuses[int(rng.integers(0, 4))]}
+        for i in range(n)
+    ]
+
+def bench_render(seconds):
+    from interface.ui_components import render_radar_graph, style_log_dataframe
+
+    rng = np.random.default_rng(0)
+    results = {}
+    for n in FLEET_SIZES:
+        fleet = synthetic_fleet(n, rng)
+        logs = synthetic_logs(n, rng)
+        results[f"render.radar.{n}"] = measure(lambda: render_radar_graph(fleet, 15.0), seconds)
+        # Styler is lazy; to_html forces the per-cell styling work the dashboard pays for.
+        results[f"render.log_table.{n}"] = measure(lambda: style_log_dataframe(logs).to_html(), seconds)
+    return results
+
+SECTIONS = {
+    "crypto": lambda args: bench_crypto(args.seconds),
+    "packets": lambda args: bench_packets(args.seconds),
+    "hub": lambda args: bench_hub(args.hub_packets),
+    "render": lambda args: bench_render(args.seconds),
+}
+
+def compare(results, baseline, tolerance):
+    comparison = {}
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            comparison[name] = {"baseline_ops_per_sec": None, "ratio": None, "status": "new"}
+            continue
+        ratio = result["ops_per_sec"] / base["ops_per_sec"]
+        comparison[name] = {
+            "baseline_ops_per_sec": base["ops_per_sec"],
+            "ratio": round(ratio, 3),
+            "status": "regression" if ratio < 1.0 - tolerance else "ok",
+        }
+    return comparison
+
+def main():
+    parser = argparse.ArgumentParser(description="Crypto, hub and rendering benchmark suite")
+    parser.add_argument("--only", default=",".join(SECTIONS), help="comma-separated sections: " + ", ".join(SECTIONS))
+    parser.add_argument("--seconds", type=float, default=0.5, help="time budget per micro benchmark")
+    parser.add_argument("--hub-packets", type=int, default=HUB_PACKETS)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before flagging a regression")
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    # The sections provision identities and write hub logs. Point both at a
+    # scratch directory before anything imports the engine, so a run never
+    # touches the real keys/keystore.pack or logs/ and the hub starts from a
+    # fresh state with only the Bench units in it.
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="catenate-bench-") as scratch:
+        os.environ["CATENATE_KEYS_DIR"] = os.path.join(scratch, "keys")
+        os.environ["CATENATE_LOG_DIR"] = os.path.join(scratch, "logs")
+        for section in args.only.split(","):
+            print(f"running {section} ...", file=sys.stderr)
+            results.update(SECTIONS[section.strip()](args))
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f).get("results", {})
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+        "comparison": compare(results, baseline, args.tolerance),
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"meta": report["meta"], "results": results}, f, indent=2)
+
+    regressions = [name for name, c in report["comparison"].items() if c["status"] == "regression"]
+    for name in regressions:
+        print(f"REGRESSION {name}: {report['comparison'][name]['ratio']:.2f}x of baseline", file=sys.stderr)
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import streamlit as st
-import plotly.graph_objects as go
-import pandas as pd
+import numpy as np
+from collections import OrderedDict
+from kernel.mesh import NO_ROUTE
 
 CYBERPUNK_CSS = """
     <style>
@@ -16,57 +17,155 @@ CYBERPUNK_CSS = """
     </style>
 """
 
-def render_radar_graph(nodes_dict, max_range_limit):
+RENDER_CACHE_SIZE = 32
+_RENDER_CACHE = OrderedDict()
 
-    node_x, node_y, node_color, node_text, node_size = [], [], [], [], []
-    line_x, line_y = [], [] 
+def cached_render(name, version, build):
+    # Shared by every browser session: the first viewer to see a new state
+    # version builds the element, everyone else reuses it.
+    hit = _RENDER_CACHE.get(name)
+    if hit is None or hit[0] != version:
+        hit = _RENDER_CACHE[name] = (version, build())
+        while len(_RENDER_CACHE) > RENDER_CACHE_SIZE:
+            _RENDER_CACHE.popitem(last=False)
+    return hit[1]
 
-    for n in nodes_dict.values():
-        node_x.append(n.x)
-        node_y.append(n.y)
-        dist = (n.x**2 + n.y**2)**0.5
-        out_of_range = dist > max_range_limit
-        
-        if not n.alive:
-            status_color = "#333333" 
-        elif n.is_compromised:
-            status_color = "#FFA500" 
-        elif out_of_range:
-            status_color = "#FF0000" 
-        else:
-            status_color = "#00FF00" 
-
-        node_color.append(status_color)
-        
-        status_txt = "OOR" if out_of_range else ("KIA" if not n.alive else "OK")
-        info = f"{n.node_id}<br>Bat: {int(n.battery)}%<br>Stat: {status_txt}"
-        node_text.append(info)
-        
-        sz = 25 if n.is_sending else 15
-        node_size.append(sz)
+# Past WEBGL_THRESHOLD units the radar switches to WebGL traces and only
+# labels selected or alerting units; past DENSITY_THRESHOLD the healthy
+# bulk of the fleet is drawn as a density map instead of markers.
+WEBGL_THRESHOLD = 300
+DENSITY_THRESHOLD = 2000
+DENSITY_BINS = 60
+LABEL_LIMIT = 100
+
+# Status codes index into the palette: OK, relayed, unreachable, compromised, dead.
+_PALETTE = ["#00FF00", "#00FFFF", "#FF0000", "#FFA500", "#333333"]
+_COLORSCALE = [
+    [edge, color]
+    for i, color in enumerate(_PALETTE)
+    for edge in (i / len(_PALETTE), (i + 1) / len(_PALETTE))
+]
+
+def _segments(x0, y0, x1, y1):
+    gap = np.full(len(x0), np.nan)
+    return np.column_stack([x0, x1, gap]).ravel(), np.column_stack([y0, y1, gap]).ravel()
+
+def _parent_coords(fleet, slots):
+    parents = fleet.next_hop[slots]
+    relayed = parents >= 0
+    px = np.where(relayed, fleet.x[np.where(relayed, parents, 0)], 0.0)
+    py = np.where(relayed, fleet.y[np.where(relayed, parents, 0)], 0.0)
+    return parents, px, py
+
+def render_radar_graph(fleet, max_range_limit, selected=None):
+    # Plotting and table libraries load on first render, not at import.
+    import plotly.graph_objects as go
+
+    n = len(fleet.ids)
+    large = n >= WEBGL_THRESHOLD
+    dense = n >= DENSITY_THRESHOLD
+    Scatter = go.Scattergl if large else go.Scatter
+    axis_limit = max(20, max_range_limit + 5)
+
+    node_x, node_y = fleet.x, fleet.y
+    routed = fleet.next_hop != NO_ROUTE
+    unreachable = fleet.alive & ~routed
+
+    status = np.select(
+        [~fleet.alive, fleet.compromised, unreachable, fleet.hops > 1],
+        [4, 3, 2, 1],
+        default=0
+    )
+    alerting = fleet.alive & (fleet.compromised | unreachable)
+
+    status_txt = np.select(
+        [~fleet.alive, unreachable, fleet.hops > 1],
+        ["KIA", "OOR", np.char.add("RELAY x", fleet.hops.astype(str))],
+        default="OK"
+    )
+
+    mesh_slots = np.flatnonzero(routed & fleet.alive)
+    _, px, py = _parent_coords(fleet, mesh_slots)
+    mesh_x, mesh_y = _segments(node_x[mesh_slots], node_y[mesh_slots], px, py)
 
-        if n.is_sending and n.alive and not out_of_range:
-            line_x.extend([0, n.x, None])
-            line_y.extend([0, n.y, None])
+    # Trace each transmitting unit's full relay path back to the hub.
+    line_parts_x, line_parts_y = [], []
+    hop_slots = np.flatnonzero(fleet.sending & fleet.alive & routed)
+    for _ in range(n):
+        if not hop_slots.size:
+            break
+        parents, px, py = _parent_coords(fleet, hop_slots)
+        seg_x, seg_y = _segments(node_x[hop_slots], node_y[hop_slots], px, py)
+        line_parts_x.append(seg_x)
+        line_parts_y.append(seg_y)
+        hop_slots = np.unique(parents[parents >= 0])
+    line_x = np.concatenate(line_parts_x) if line_parts_x else []
+    line_y = np.concatenate(line_parts_y) if line_parts_y else []
+
+    ids = np.asarray(fleet.ids, dtype=object)
+    is_selected = ids == selected if selected is not None else np.zeros(n, dtype=bool)
+
+    if dense:
+        # Healthy units become a density map; anything worth a look keeps its marker.
+        shown = alerting | ~fleet.alive | fleet.sending | is_selected
+        bulk = fleet.alive & ~shown
+    else:
+        shown = np.ones(n, dtype=bool)
+
+    if large:
+        # Compromised units get labels before unreachable ones; the rest stay anonymous.
+        labelled = is_selected.copy()
+        alert_order = np.concatenate([np.flatnonzero(alerting & fleet.compromised), np.flatnonzero(alerting & ~fleet.compromised)])
+        labelled[alert_order[:LABEL_LIMIT]] = True
+    else:
+        labelled = shown
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
+    if dense:
+        fig.add_trace(go.Histogram2d(
+            x=node_x[bulk], y=node_y[bulk],
+            xbins=dict(start=-axis_limit, end=axis_limit, size=2 * axis_limit / DENSITY_BINS),
+            ybins=dict(start=-axis_limit, end=axis_limit, size=2 * axis_limit / DENSITY_BINS),
+            colorscale=[[0, 'rgba(0, 255, 0, 0)'], [1, 'rgba(0, 255, 0, 0.8)']],
+            showscale=False,
+            hoverinfo='skip'
+        ))
+
+    fig.add_trace(Scatter(
+        x=mesh_x, y=mesh_y,
+        mode='lines',
+        line=dict(color='rgba(0, 255, 255, 0.15)', width=1),
+        hoverinfo='skip'
+    ))
+
+    fig.add_trace(Scatter(
         x=line_x, y=line_y,
         mode='lines',
-        line=dict(color='#00FF00', width=1, dash='dot'),
+        line=dict(color='#00FF00', width=1, dash='solid' if large else 'dot'),
         hoverinfo='skip'
     ))
 
-    fig.add_trace(go.Scatter(
-        x=node_x, y=node_y,
-        mode='markers+text',
-        text=[n.node_id for n in nodes_dict.values()],
-        textposition="bottom center",
-        marker=dict(size=node_size, color=node_color, line=dict(width=2, color='white')),
-        hovertext=node_text,
-        hoverinfo="text"
+    fig.add_trace(Scatter(
+        x=node_x[shown], y=node_y[shown],
+        mode='markers',
+        marker=dict(
+            size=np.where(fleet.sending[shown], 25, 15) if not large else np.where(fleet.sending[shown], 8, 5),
+            color=status[shown], colorscale=_COLORSCALE, cmin=-0.5, cmax=len(_PALETTE) - 0.5,
+            line=dict(width=0 if large else 2, color='white')
+        ),
+        customdata=np.column_stack([ids[shown], fleet.battery[shown].astype(int), status_txt[shown]]),
+        hovertemplate="%{customdata[0]}<br>Bat: %{customdata[1]}%<br>Stat: %{customdata[2]}<extra></extra>"
     ))
 
+    if labelled.any():
+        fig.add_trace(go.Scatter(
+            x=node_x[labelled], y=node_y[labelled],
+            mode='text',
+            text=ids[labelled],
+            textposition="bottom center",
+            hoverinfo='skip'
+        ))
+
     fig.add_trace(go.Scatter(
         x=[0], y=[0],
         mode='markers',
@@ -84,8 +183,6 @@ def render_radar_graph(nodes_dict, max_range_limit):
         fillcolor="rgba(0, 0, 0, 0)",
     )
 
-    axis_limit = max(20, max_range_limit + 5)
-
     fig.update_layout(
         plot_bgcolor='rgba(0,0,0,0)',
         paper_bgcolor='rgba(0,0,0,0)',
@@ -109,6 +206,7 @@ def render_radar_graph(nodes_dict, max_range_limit):
 def style_log_dataframe(logs_list):
     if not logs_list:
         return None
+    import pandas as pd
         
     df = pd.DataFrame(logs_list)
     
@@ -0,0 +1,145 @@
+import threading
+
+ADMIT_RATE = 10.0
+ADMIT_BURST = 20.0
+# A sender is quarantined once its offence score (an EWMA over its recent
+# verdicts) reaches the threshold; each repeat offence doubles the sentence.
+QUARANTINE_THRESHOLD = 0.5
+QUARANTINE_MIN_SAMPLES = 8
+QUARANTINE_SECONDS = 10.0
+QUARANTINE_MAX_SECONDS = 300.0
+SCORE_DECAY = 0.1
+# Packets in flight under one claimed sender ID that have not yet proven
+# the sender's key, and how fast that budget refills after failed checks.
+FORGED_RATE = 2.0
+FORGED_BURST = 10.0
+
+# Rejections issued before the sender's key checked out. The sender ID in
+# a header is not authenticated, so these prove nothing about the unit it
+# names: they never score as offences and the admission token is refunded.
+UNAUTHENTICATED = frozenset((
+    "Timestamp Expired", "Replay Detected", "Unknown Signal Source", "No Key Found",
+    "Session Expired", "Bad Signature", "Malformed Frame", "Malformed Packet",
+))
+
+def is_offence(type_, content, status):
+    # Only verdicts reached under the sender's own key: garbage behind a
+    # valid signature, or a payload a malware rule flagged.
+    if type_ == "SEC":
+        return content in ("Decryption Fail", "Malformed Bundle")
+    return status != "VERIFIED"
+
+class _Sender:
+    __slots__ = ("tokens", "suspect", "stamp", "score", "samples", "strikes", "until", "admitted", "forged", "shed_rate", "shed_quarantine", "shed_forged")
+
+    def __init__(self, tokens, now):
+        self.tokens = tokens
+        self.suspect = FORGED_BURST
+        self.stamp = now
+        self.score = 0.0
+        self.samples = 0
+        self.strikes = 0
+        self.until = 0.0
+        self.admitted = 0
+        self.forged = 0
+        self.shed_rate = 0
+        self.shed_quarantine = 0
+        self.shed_forged = 0
+
+class AdmissionControl:
+    # Sits in front of the hub's crypto: a token bucket per sender plus a
+    # quarantine fed back from the verdicts. admit() is a dict lookup and a
+    # little arithmetic, so shed packets cost no verify work at all. Only
+    # the hub listener admits; verdicts may be recorded from shard reader
+    # threads, so record() takes the lock. Counters are best-effort.
+    #
+    # Admission goes by the claimed sender ID, so only authenticated
+    # verdicts can quarantine a unit. Forged-signature floods under a
+    # unit's ID are bounded by a separate per-ID budget of failed checks:
+    # they can slow the unit they impersonate while they last, but never
+    # spend its allowance or get it quarantined.
+
+    def __init__(self, rate=ADMIT_RATE, burst=ADMIT_BURST, threshold=QUARANTINE_THRESHOLD, quarantine=QUARANTINE_SECONDS):
+        self.enabled = True
+        self.rate = rate
+        self.burst = burst
+        self.threshold = threshold
+        self.quarantine = quarantine
+        self._senders = {}
+        self._lock = threading.Lock()
+
+    def admit(self, sender_id, now):
+        if not self.enabled:
+            return True
+        sender = self._senders.get(sender_id)
+        if sender is None:
+            with self._lock:
+                sender = self._senders.setdefault(sender_id, _Sender(self.burst, now))
+        if now < sender.until:
+            sender.shed_quarantine += 1
+            return False
+        elapsed = now - sender.stamp
+        sender.stamp = now
+        sender.suspect = min(FORGED_BURST, sender.suspect + elapsed * FORGED_RATE)
+        if sender.suspect < 1.0:
+            sender.shed_forged += 1
+            return False
+        sender.tokens = min(self.burst, sender.tokens + elapsed * self.rate)
+        if sender.tokens < 1.0:
+            sender.shed_rate += 1
+            return False
+        sender.tokens -= 1.0
+        sender.suspect -= 1.0
+        sender.admitted += 1
+        return True
+
+    def record(self, sender_id, type_, content, status, now):
+        # Returns the sentence in seconds when this verdict tips the sender
+        # into quarantine, else None. Senders never admitted are not tracked.
+        sender = self._senders.get(sender_id)
+        if sender is None:
+            return None
+        with self._lock:
+            if type_ == "SEC" and content in UNAUTHENTICATED:
+                # Not provably the unit's packet: give its allowance back
+                # and leave the suspect budget spent.
+                sender.tokens = min(self.burst, sender.tokens + 1.0)
+                sender.forged += content == "Bad Signature"
+                return None
+            sender.suspect = min(FORGED_BURST, sender.suspect + 1.0)
+            offence = is_offence(type_, content, status)
+            sender.score += SCORE_DECAY * (offence - sender.score)
+            sender.samples += 1
+            if now < sender.until or sender.samples < QUARANTINE_MIN_SAMPLES or sender.score < self.threshold:
+                return None
+            sender.strikes += 1
+            seconds = min(self.quarantine * 2 ** (sender.strikes - 1), QUARANTINE_MAX_SECONDS)
+            sender.until = now + seconds
+            # Released senders start over on probation.
+            sender.score = 0.0
+            sender.samples = 0
+            return seconds
+
+    def stats(self, sender_id, now):
+        sender = self._senders.get(sender_id)
+        if sender is None:
+            return {"admitted": 0, "forged": 0, "shed_rate": 0, "shed_quarantine": 0, "shed_forged": 0, "score": 0.0, "strikes": 0, "quarantine_left": 0.0}
+        return {
+            "admitted": sender.admitted,
+            "forged": sender.forged,
+            "shed_rate": sender.shed_rate,
+            "shed_quarantine": sender.shed_quarantine,
+            "shed_forged": sender.shed_forged,
+            "score": sender.score,
+            "strikes": sender.strikes,
+            "quarantine_left": max(0.0, sender.until - now),
+        }
+
+    def totals(self):
+        senders = list(self._senders.values())
+        return {
+            "admitted": sum(s.admitted for s in senders),
+            "rate": sum(s.shed_rate for s in senders),
+            "quarantine": sum(s.shed_quarantine for s in senders),
+            "forged": sum(s.shed_forged for s in senders),
+        }
@@ -0,0 +1,214 @@
+import argparse
+import json
+import os
+import queue
+import struct
+import threading
+import time
+from collections import Counter
+from protocols.wire import FrameError, frame_timestamp, peek_sender_index, restamp_frame
+from .rules import RULES_PATH
+from .shards import FRAME, PACKET, PEER, SESSION, HubCore, ShardedHub, packet_message, peer_message, session_message
+
+# Capture file: preamble | JSON header (network key, hub scheme) | records.
+# A record is the hub message the packet would travel as between the
+# dashboard and a shard, prefixed with the enqueue time and queue priority:
+#   enqueued f64 | kind u8 | priority u8 | body length u32 | body
+# Records are self-delimiting, so a capture can be read while it grows.
+CAPTURE_MAGIC = b"CUCAP"
+CAPTURE_VERSION = 1
+_PREAMBLE = struct.Struct("<5sBI")
+_RECORD = struct.Struct("<dBBI")
+REPLAY_BATCH = 64
+
+class CaptureError(ValueError):
+    pass
+
+class PacketCapture:
+    # Peers and sessions are recorded alongside the packets so a replay can
+    # rebuild the hub's view without any bots. Producers only stamp and
+    # enqueue; flush() encodes and writes, so the queue tap stays cheap.
+
+    def __init__(self, path, network_key, scheme, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self.packets = 0
+        self._pending = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "wb")
+        header = json.dumps({"network_key": network_key.decode("ascii"), "scheme": scheme, "started": clock()}).encode("utf-8")
+        self._file.write(_PREAMBLE.pack(CAPTURE_MAGIC, CAPTURE_VERSION, len(header)) + header)
+
+    def peers(self, peers):
+        for peer_id, slot, public_key in peers:
+            self._pending.put((self.clock(), 0, *peer_message(peer_id, slot, public_key)))
+
+    def session(self, session):
+        self._pending.put((self.clock(), 0, *session_message(session)))
+
+    def packet(self, item, priority=0):
+        # kind None: the packet is encoded at flush time, off the sender's path.
+        self._pending.put((self.clock(), priority, None, item))
+        self.packets += 1
+
+    def flush(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            records = []
+            while True:
+                try:
+                    enqueued, priority, kind, body = self._pending.get_nowait()
+                except queue.Empty:
+                    break
+                if kind is None:
+                    kind, body = packet_message(body)
+                records.append(_RECORD.pack(enqueued, kind, priority, len(body)) + body)
+            self._file.write(b"".join(records))
+            self._file.flush()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._file.close()
+
+def read_capture(path):
+    f = open(path, "rb")
+    preamble = f.read(_PREAMBLE.size)
+    if len(preamble) < _PREAMBLE.size:
+        f.close()
+        raise CaptureError("short capture")
+    magic, version, length = _PREAMBLE.unpack(preamble)
+    if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION:
+        f.close()
+        raise CaptureError("bad magic or version")
+    header = json.loads(f.read(length))
+
+    def records():
+        # A torn record at the tail (capture still being written) ends the stream.
+        with f:
+            while True:
+                head = f.read(_RECORD.size)
+                if len(head) < _RECORD.size:
+                    return
+                enqueued, kind, priority, length = _RECORD.unpack(head)
+                body = f.read(length)
+                if len(body) < length:
+                    return
+                yield enqueued, kind, priority, body
+
+    return header, records()
+
+def _prepare(kind, body, shift, slots):
+    # Re-dates a record by `shift` seconds, keeping each packet's original
+    # offset from its enqueue time, and works out which sender it belongs to.
+    if kind == PEER:
+        peer = json.loads(body)
+        slots[peer["slot"]] = peer["id"]
+        return peer["id"], kind, body
+    if kind == SESSION:
+        state = json.loads(body)
+        state["created"] += shift
+        return state["peer"], kind, json.dumps(state).encode("utf-8")
+    if kind == FRAME:
+        try:
+            sender_id = slots.get(peek_sender_index(body), "UNKNOWN")
+        except FrameError:
+            return "UNKNOWN", kind, body
+        return sender_id, kind, restamp_frame(body, frame_timestamp(body) + shift)
+    if kind == PACKET:
+        from protocols.packet import DataPacket
+        try:
+            packet = DataPacket.model_validate_json(body)
+            packet.timestamp = str(float(packet.timestamp) + shift)
+        except ValueError:
+            return "UNKNOWN", kind, body
+        return packet.sender_id, kind, packet.to_json().encode("utf-8")
+    return "UNKNOWN", kind, body
+
+def replay(path, speed=1.0, shards=0, rules_path=RULES_PATH, batch=REPLAY_BATCH, drain_timeout=60.0):
+    # speed=None feeds the hub as fast as it keeps up. shards=0 verifies in
+    # this process; otherwise the capture goes through a ShardedHub.
+    header, records = read_capture(path)
+    network_key = header["network_key"].encode("ascii")
+    slots = {}
+    rows = []
+
+    if shards:
+        hub = ShardedHub(shards, network_key, header["scheme"], lambda slot: slots.get(slot, "UNKNOWN"), rows.extend, rules_path).start()
+        feed = hub.dispatch
+    else:
+        hub = None
+        core = HubCore(network_key, header["scheme"], rules_path)
+
+        def feed(messages):
+            for _, kind, body in messages:
+                rows.extend(core.handle(kind, body) or ())
+
+    total = packets = 0
+    pending = []
+    first = None
+    start = time.perf_counter()
+    try:
+        for enqueued, kind, _, body in records:
+            if first is None:
+                first = enqueued
+            now = time.time()
+            if speed:
+                wait = (enqueued - first) / speed - (time.perf_counter() - start)
+                if wait > 0:
+                    feed(pending)
+                    pending = []
+                    time.sleep(wait)
+                    now = time.time()
+            pending.append(_prepare(kind, body, now - enqueued, slots))
+            total += 1
+            packets += kind in (FRAME, PACKET)
+            if len(pending) >= batch:
+                feed(pending)
+                pending = []
+        feed(pending)
+
+        if hub is not None:
+            deadline = time.monotonic() + drain_timeout
+            while hub.pending() and time.monotonic() < deadline:
+                time.sleep(0.005)
+        elapsed = time.perf_counter() - start
+    finally:
+        if hub is not None:
+            hub.stop()
+
+    return {
+        "capture": path,
+        "records": total,
+        "packets": packets,
+        "results": len(rows),
+        "speed": speed or "max",
+        "shards": shards,
+        "wall_seconds": round(elapsed, 3),
+        "packets_per_sec": round(packets / elapsed, 1) if elapsed else None,
+        "statuses": dict(Counter(row[2] for row in rows)),
+        "rejections": dict(Counter(row[1] for row in rows if row[0] == "SEC")),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a traffic capture into the hub")
+    parser.add_argument("capture")
+    parser.add_argument("--speed", default="1", help="playback rate (1, 10, ...) or 'max'")
+    parser.add_argument("--shards", type=int, default=0, help="hub processes to replay into (0 = in-process)")
+    parser.add_argument("--rules", default=RULES_PATH)
+    parser.add_argument("--out", help="write the summary JSON here")
+    args = parser.parse_args()
+
+    speed = None if args.speed == "max" else float(args.speed)
+    summary = replay(args.capture, speed, args.shards, args.rules)
+
+    text = json.dumps(summary, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+
+if __name__ == "__main__":
+    main()
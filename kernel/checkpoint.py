@@ -0,0 +1,98 @@
+import hashlib
+import hmac
+import json
+import os
+import numpy as np
+
+CHECKPOINT_PATH = os.path.join("checkpoints", "fleet.npz")
+CHECKPOINT_VERSION = 2
+# Per-deployment secret that authenticates checkpoints. It lives next to
+# the keystore: the network key travels inside the checkpoint, so it
+# cannot vouch for the file.
+CHECKPOINT_KEY_FILE = "checkpoint.key"
+
+class CheckpointError(ValueError):
+    pass
+
+def _pack(blobs):
+    offsets = np.zeros(len(blobs) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in blobs], out=offsets[1:])
+    return np.frombuffer(b"".join(blobs), dtype=np.uint8), offsets
+
+def _unpack(data, offsets):
+    raw = data.tobytes()
+    return [raw[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+def checkpoint_key(keys_dir):
+    path = os.path.join(keys_dir, CHECKPOINT_KEY_FILE)
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    os.makedirs(keys_dir, exist_ok=True)
+    key = os.urandom(32)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # Another process created it first; use theirs.
+        with open(path, "rb") as f:
+            return f.read()
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+def _mac(key, arrays):
+    # Covers every array by name, dtype, shape and contents, so nothing can
+    # be swapped, reshaped or added without breaking the tag.
+    tag = hmac.new(key, digestmod=hashlib.sha256)
+    for name in sorted(arrays):
+        array = np.ascontiguousarray(arrays[name])
+        tag.update(json.dumps([name, array.dtype.str, array.shape]).encode("utf-8"))
+        tag.update(array.tobytes())
+    return tag.digest()
+
+def write_checkpoint(path, meta, ids, columns, identities, key):
+    # A single uncompressed .npz: fleet columns as arrays, every unit's key
+    # pair as one DER blob plus offsets, everything else as one JSON
+    # document, and an HMAC over all of it. Written to a temp file first so
+    # a crash never leaves half a checkpoint behind.
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    schemes = [scheme for scheme, _, _ in identities]
+    priv, priv_offsets = _pack([priv_der for _, priv_der, _ in identities])
+    pub, pub_offsets = _pack([pub_der for _, _, pub_der in identities])
+    arrays = {
+        "meta": np.array(json.dumps({**meta, "version": CHECKPOINT_VERSION, "schemes": schemes})),
+        "ids": np.array(ids, dtype=str),
+        "priv": priv, "priv_offsets": priv_offsets,
+        "pub": pub, "pub_offsets": pub_offsets,
+        **{f"fleet_{name}": column for name, column in columns.items()},
+    }
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, mac=np.frombuffer(_mac(key, arrays), dtype=np.uint8), **arrays)
+    os.replace(tmp, path)
+
+def read_checkpoint(path, key):
+    # The keys inside are only as good as the file, so the file is checked
+    # once as a whole before anything in it is used.
+    try:
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files}
+    except (OSError, KeyError, ValueError) as e:
+        raise CheckpointError(f"{type(e).__name__}: {e}") from e
+    mac = arrays.pop("mac", None)
+    if mac is None or not hmac.compare_digest(mac.tobytes(), _mac(key, arrays)):
+        raise CheckpointError("checkpoint is not signed by this deployment's checkpoint key")
+    try:
+        meta = json.loads(str(arrays["meta"]))
+        ids = arrays["ids"].tolist()
+        columns = {name[len("fleet_"):]: column for name, column in arrays.items() if name.startswith("fleet_")}
+        identities = list(zip(meta.get("schemes", []), _unpack(arrays["priv"], arrays["priv_offsets"]), _unpack(arrays["pub"], arrays["pub_offsets"])))
+    except (KeyError, ValueError) as e:
+        raise CheckpointError(f"{type(e).__name__}: {e}") from e
+    if meta.get("version") != CHECKPOINT_VERSION:
+        raise CheckpointError(f"unsupported checkpoint version {meta.get('version')}")
+    if len(identities) != len(ids):
+        raise CheckpointError("identity count does not match the fleet")
+    return meta, ids, columns, identities
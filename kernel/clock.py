@@ -0,0 +1,30 @@
+import time
+
+class WallClock:
+    virtual = False
+
+    def time(self):
+        return time.time()
+
+    def monotonic(self):
+        return time.monotonic()
+
+class VirtualClock:
+    # Simulated time only moves when the runner advances it, so a 10-minute
+    # scenario costs however long the events take to compute.
+    virtual = True
+
+    def __init__(self, start=None):
+        self._now = time.time() if start is None else start
+
+    def time(self):
+        return self._now
+
+    def monotonic(self):
+        return self._now
+
+    def advance_to(self, when):
+        if when > self._now:
+            self._now = when
+
+WALL_CLOCK = WallClock()
@@ -0,0 +1,142 @@
+import threading
+from collections import namedtuple
+import numpy as np
+from .mesh import NO_ROUTE
+
+REVIVE_CHANCE_PER_SEC = 0.05
+
+FleetView = namedtuple("FleetView", "ids x y battery alive compromised sending distance in_range next_hop hops")
+
+class FleetStore:
+    # Struct-of-arrays unit state: one column per attribute, one row (slot)
+    # per unit. BotThread attributes are views onto a row.
+
+    _COLUMNS = (
+        ("x", np.float64, 0.0),
+        ("y", np.float64, 0.0),
+        ("battery", np.float64, 100.0),
+        ("alive", np.bool_, True),
+        ("compromised", np.bool_, False),
+        ("sending", np.bool_, False),
+        ("distance", np.float64, 0.0),
+        ("in_range", np.bool_, False),
+        ("tx_count", np.int32, 0),
+        ("next_hop", np.int32, NO_ROUTE),
+        ("hops", np.int16, 0),
+    )
+
+    def __init__(self, capacity=64):
+        self._lock = threading.Lock()
+        self.size = 0
+        self.version = 0
+        self.ids = []
+        self.slots = {}
+        for name, dtype, _ in self._COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self, capacity):
+        for name, dtype, _ in self._COLUMNS:
+            column = np.zeros(capacity, dtype=dtype)
+            column[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, column)
+
+    def id_at(self, slot):
+        return self.ids[slot] if slot < self.size else "UNKNOWN"
+
+    def add(self, node_id, x, y):
+        with self._lock:
+            if node_id in self.slots:
+                slot = self.slots[node_id]
+            else:
+                slot = self.size
+                if slot >= len(self.x):
+                    self._grow(max(64, 2 * len(self.x)))
+                self.ids.append(node_id)
+                self.slots[node_id] = slot
+                self.size += 1
+
+            for name, _, default in self._COLUMNS:
+                getattr(self, name)[slot] = default
+            self.x[slot] = x
+            self.y[slot] = y
+            self.distance[slot] = np.hypot(x, y)
+            self.version += 1
+            return slot
+
+    def columns(self):
+        n = self.size
+        return {name: getattr(self, name)[:n].copy() for name, _, _ in self._COLUMNS}
+
+    def load(self, ids, columns):
+        # Bulk restore into an empty store: one copy per column instead of
+        # an add() per unit. Columns missing from `columns` get defaults.
+        with self._lock:
+            if self.size:
+                raise ValueError("fleet store is not empty")
+            n = len(ids)
+            if n > len(self.x):
+                self._grow(max(64, n))
+            for name, _, default in self._COLUMNS:
+                getattr(self, name)[:n] = columns[name] if name in columns else default
+            self.ids = list(ids)
+            self.slots = {node_id: slot for slot, node_id in enumerate(self.ids)}
+            self.size = n
+            self.version += 1
+
+    def tick(self, dt, max_range, batt_drain_mod, auto_revive, rng):
+        # Only bumps the version when a column actually moved, so an idle
+        # fleet keeps its published snapshot instead of re-copying it.
+        n = self.size
+        if n == 0:
+            return
+        changed = False
+
+        alive = self.alive[:n]
+        battery = self.battery[:n]
+
+        distance = np.hypot(self.x[:n], self.y[:n])
+        in_range = distance <= max_range
+        if not (np.array_equal(distance, self.distance[:n]) and np.array_equal(in_range, self.in_range[:n])):
+            self.distance[:n] = distance
+            self.in_range[:n] = in_range
+            changed = True
+
+        sends = self.tx_count[:n]
+        if sends.any():
+            battery -= sends * rng.uniform(0.5, 1.5, n) * batt_drain_mod
+            sends[:] = 0
+            changed = True
+
+        drained = alive & (battery <= 0)
+        if drained.any():
+            alive[drained] = False
+            changed = True
+
+        if auto_revive:
+            revive = ~alive & (rng.random(n) < 1.0 - (1.0 - REVIVE_CHANCE_PER_SEC) ** dt)
+            if revive.any():
+                alive |= revive
+                battery[revive] = 40.0
+                changed = True
+
+        if changed:
+            self.version += 1
+
+    def snapshot(self):
+        n = self.size
+        return FleetView(
+            tuple(self.ids[:n]),
+            self.x[:n].copy(),
+            self.y[:n].copy(),
+            self.battery[:n].copy(),
+            self.alive[:n].copy(),
+            self.compromised[:n].copy(),
+            self.sending[:n].copy(),
+            self.distance[:n].copy(),
+            self.in_range[:n].copy(),
+            self.next_hop[:n].copy(),
+            self.hops[:n].copy(),
+        )
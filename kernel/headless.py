@@ -0,0 +1,107 @@
+import argparse
+import json
+import time
+from .clock import VirtualClock
+from .metrics import METRICS
+from .state_manager import get_state
+from .simulation_engine import HubListener, deploy_units, fleet_physics, log_flusher, preload_peer_keys, restore_checkpoint, save_checkpoint, start_capture, stop_capture
+
+STATE = get_state()
+
+def hub_pump(listener, interval):
+    while True:
+        yield interval
+        while True:
+            batch = listener.next_batch(timeout=None)
+            if not batch:
+                break
+            for packet in batch:
+                listener.process(packet)
+
+def run(units, duration, seed, hack_prob=0.0, jitter=0.0, speed_mod=1.0, auth_mode="signature", wire_format="binary", bundle_size=1, bundle_window=2.0, admission=True, hub_interval=0.05, metrics=False, capture=None, restore=None, checkpoint=None):
+    STATE.seed(seed)
+    STATE.use_clock(VirtualClock())
+    if restore:
+        # Command-line settings still win over the ones saved in the checkpoint.
+        restore_checkpoint(restore)
+    STATE.hack_prob = hack_prob
+    STATE.jitter = jitter
+    STATE.speed_mod = speed_mod
+    STATE.auth_mode = auth_mode
+    STATE.wire_format = wire_format
+    STATE.bundle_size = bundle_size
+    STATE.bundle_window = bundle_window
+    STATE.admission.enabled = admission
+    STATE.is_running = True
+    METRICS.enabled = metrics
+
+    preload_peer_keys()
+    if capture:
+        start_capture(capture)
+    STATE.scheduler.schedule(fleet_physics())
+    STATE.scheduler.schedule(log_flusher())
+    STATE.scheduler.schedule(hub_pump(HubListener(), hub_interval))
+    deploy_units(units)
+
+    wall_start = time.perf_counter()
+    STATE.scheduler.run_until(STATE.clock.monotonic() + duration)
+    wall = time.perf_counter() - wall_start
+    STATE.log_store.flush()
+    captured = stop_capture()
+    if checkpoint:
+        save_checkpoint(checkpoint)
+
+    return {
+        "seed": seed,
+        "units": len(STATE.nodes),
+        "sim_seconds": duration,
+        "wall_seconds": round(wall, 3),
+        "speedup": round(duration / wall, 1) if wall else None,
+        "verified": STATE.status_counts["VERIFIED"],
+        "blocked": STATE.status_counts["BLOCKED"],
+        "rejected": STATE.status_counts["REJECTED"],
+        "critical": STATE.status_counts["CRITICAL"],
+        "queued": STATE.packet_queue.qsize(),
+        "dropped": sum(STATE.packet_queue.dropped.values()),
+        "shed": {r: c for r, c in STATE.admission.totals().items() if r != "admitted"},
+        **({"latency_us": METRICS.summary()} if metrics else {}),
+        **({"captured": captured.packets} if captured else {}),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the simulation headless on a virtual clock")
+    parser.add_argument("--units", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=600.0, help="simulated seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--hack-prob", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--auth-mode", choices=["signature", "session"], default="signature")
+    parser.add_argument("--wire-format", choices=["binary", "json"], default="binary")
+    parser.add_argument("--bundle-size", type=int, default=1, help="payloads per signed bundle (1 = one packet per payload)")
+    parser.add_argument("--bundle-window", type=float, default=2.0, help="seconds a unit holds a partial bundle")
+    parser.add_argument("--no-admission", action="store_true", help="let every packet through to verification")
+    parser.add_argument("--metrics", action="store_true", help="record per-stage latency histograms (wall-clock cost of each stage)")
+    parser.add_argument("--capture", help="record every queued packet to this capture file")
+    parser.add_argument("--restore", help="start from this checkpoint; --units then only adds units")
+    parser.add_argument("--checkpoint", help="save a checkpoint here when the run ends")
+    parser.add_argument("--out", help="write the summary JSON here")
+    args = parser.parse_args()
+
+    summary = run(
+        args.units, args.duration, args.seed,
+        hack_prob=args.hack_prob, jitter=args.jitter,
+        speed_mod=args.speed, auth_mode=args.auth_mode,
+        wire_format=args.wire_format, bundle_size=args.bundle_size,
+        bundle_window=args.bundle_window, admission=not args.no_admission, metrics=args.metrics,
+        capture=args.capture, restore=args.restore, checkpoint=args.checkpoint
+    )
+
+    text = json.dumps(summary, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+
+if __name__ == "__main__":
+    main()
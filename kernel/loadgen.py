@@ -0,0 +1,283 @@
+import argparse
+import base64
+import json
+import random
+import sys
+import threading
+from collections import Counter
+import time
+from protocols.wire import encode_frame, restamp_frame
+from .metrics import LatencyHistogram
+from .packet_queue import POLICIES
+from .state_manager import get_state
+from .simulation_engine import HubListener, PacketFactory, deploy_units, preload_peer_keys
+
+STATE = get_state()
+
+PATTERNS = ("constant", "poisson", "ramp")
+# The queue is saturated once it has grown (or shed packets) this many windows in a row.
+SATURATION_WINDOWS = 3
+
+def arrivals(pattern, rate, duration, rng, ramp_to=None):
+    # Offsets in seconds from the start of the run. "ramp" climbs linearly
+    # from rate to ramp_to over the run, so one run sweeps the load range.
+    t = 0.0
+    while True:
+        if pattern == "poisson":
+            t += rng.expovariate(rate)
+        elif pattern == "ramp":
+            t += 1.0 / (rate + (ramp_to - rate) * min(t / duration, 1.0))
+        else:
+            t += 1.0 / rate
+        if t >= duration:
+            return
+        yield t
+
+def build_pool(bots, size, hack_prob, wire_format, rng):
+    # Signed ahead of time, so the generator is never the bottleneck. The
+    # timestamp is not signed; each packet is re-dated when it is sent.
+    # Every packet is signed once: the replay guard remembers signatures
+    # for its whole window, so a reused one would be rejected unverified.
+    pool = []
+    for i in range(size):
+        bot = bots[i % len(bots)]
+        p_type = rng.choice(STATE.packet_types)
+        is_malicious = rng.random() < hack_prob
+        encrypted = bot.node_logic.vault.encrypt_payload_bytes({"type": p_type, "content": PacketFactory.generate(p_type, is_malicious, rng)})
+        sig = b"INVALID_SIG_BLOCK" + encrypted[-16:] if is_malicious and rng.random() < 0.3 else bot.node_logic.vault.sign_bytes(encrypted)
+        priority = STATE.packet_priorities.get(p_type, len(STATE.packet_priorities))
+        if wire_format == "binary":
+            pool.append((encode_frame(bot.slot, 0.0, encrypted, sig), priority))
+        else:
+            from protocols.packet import DataPacket
+            pool.append((DataPacket(
+                sender_id=bot.node_id,
+                timestamp="0",
+                encrypted_payload=encrypted.decode('utf-8'),
+                signature=base64.b64encode(sig).decode('utf-8')
+            ), priority))
+    return pool
+
+def stamp(packet, now):
+    if isinstance(packet, bytes):
+        return restamp_frame(packet, now)
+    return packet.model_copy(update={"timestamp": str(now)})
+
+class LoadHubListener(HubListener):
+    # The regular hub loop, plus end-to-end latency: every packet carries
+    # its send time, so completion minus timestamp is the time spent queued,
+    # in transit and verifying.
+
+    def __init__(self, report):
+        super().__init__()
+        self.report = report
+
+    def process(self, packet, verdict=None):
+        if verdict is None:
+            verdict = self.verify(packet)
+        super().process(packet, verdict)
+        self.report.served(time.time() - float(packet.timestamp), verdict[1])
+
+class LoadReport:
+    def __init__(self):
+        self.offered = 0
+        self.refused = 0
+        self.served_total = 0
+        self.rejected = Counter()
+        self.latency = LatencyHistogram()
+        self.window_latency = LatencyHistogram()
+        self.windows = []
+
+    def served(self, seconds, rejection=None):
+        # Only packets whose signature checked out count as served; the
+        # rest are cheap rejections and would flatter the throughput.
+        if rejection:
+            self.rejected[rejection[1]] += 1
+            return
+        us = max(0, int(seconds * 1e6))
+        self.latency.record(us)
+        self.window_latency.record(us)
+        self.served_total += 1
+
+    def sample(self, elapsed, span, last):
+        # One row per window; `last` holds the previous cumulative counters.
+        window, self.window_latency = self.window_latency, LatencyHistogram()
+        dropped = sum(STATE.packet_queue.dropped.values()) + self.refused
+        shed = sum(count for reason, count in STATE.admission.totals().items() if reason != "admitted")
+        summary = window.summary()
+        row = {
+            "t": round(elapsed, 2),
+            "offered_per_sec": round((self.offered - last["offered"]) / span, 1),
+            "served_per_sec": round((self.served_total - last["served"]) / span, 1),
+            "rejected": sum(self.rejected.values()) - last["rejected"],
+            "queue_depth": STATE.packet_queue.qsize(),
+            "dropped": dropped - last["dropped"],
+            "shed": shed - last["shed"],
+            "p50_ms": summary["p50_us"] / 1000,
+            "p99_ms": summary["p99_us"] / 1000,
+        }
+        self.windows.append(row)
+        last.update(offered=self.offered, served=self.served_total, rejected=sum(self.rejected.values()), dropped=dropped, shed=shed)
+        return row
+
+    def saturation(self):
+        # The first window of a streak where the queue kept growing or shed load.
+        streak = 0
+        previous_depth = 0
+        for i, row in enumerate(self.windows):
+            growing = row["queue_depth"] > previous_depth or row["dropped"] > 0
+            previous_depth = row["queue_depth"]
+            streak = streak + 1 if growing else 0
+            if streak >= SATURATION_WINDOWS:
+                first = self.windows[i - streak + 1]
+                return {"at_seconds": first["t"], "offered_per_sec": first["offered_per_sec"], "served_per_sec": first["served_per_sec"]}
+        return None
+
+def generate(pool, schedule, report, start, stop):
+    # Open loop: packets leave on schedule whether or not the hub keeps up.
+    for (packet, priority), offset in zip(pool, schedule):
+        if stop.is_set():
+            return
+        delay = start + offset - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        report.offered += 1
+        accepted = STATE.packet_queue.put(stamp(packet, time.time()), priority)
+        if not accepted and STATE.packet_queue.policy == "block":
+            # Drop policies count their own losses in packet_queue.dropped.
+            report.refused += 1
+
+def run(pattern="constant", rate=100.0, duration=30.0, ramp_to=None, window=1.0, senders=16, hack_prob=0.0, wire_format="binary", workers=None, batch_size=None, link_latency=True, admission=False, seed=0, drain=5.0):
+    rng = random.Random(seed)
+    STATE.seed(seed)
+    if workers:
+        STATE.hub_workers = workers
+    if batch_size:
+        STATE.hub_batch_size = batch_size
+    if not link_latency:
+        STATE.link_latency = (0.0, 0.0)
+    # A handful of senders stands in for a whole fleet, so per-sender rate
+    # limits would cap the load instead of the hub.
+    STATE.admission.enabled = admission
+    # Units stay idle (the system is not "running"); they only lend identities.
+    STATE.is_running = False
+    preload_peer_keys()
+    deploy_units(senders)
+    bots = [STATE.nodes[nid] for nid in sorted(STATE.nodes)][:senders]
+    schedule = list(arrivals(pattern, rate, duration, rng, ramp_to or rate * 10))
+    print(f"signing {len(schedule)} packets ...", file=sys.stderr)
+    pool = build_pool(bots, len(schedule), hack_prob, wire_format, rng)
+
+    report = LoadReport()
+    listener = LoadHubListener(report)
+    listener.name = "LoadHubListener"
+    listener.start()
+
+    stop = threading.Event()
+    start = time.perf_counter()
+    generator = threading.Thread(
+        target=generate,
+        args=(pool, schedule, report, start, stop),
+        name="LoadGenerator",
+        daemon=True
+    )
+    generator.start()
+
+    last = {"offered": 0, "served": 0, "rejected": 0, "dropped": 0, "shed": 0}
+    end = start + duration + drain
+    tick = start
+    while True:
+        tick += window
+        time.sleep(max(0.0, tick - time.perf_counter()))
+        now = time.perf_counter()
+        report.sample(now - start, window, last)
+        # Nothing runs log_flusher here, so the log store is flushed per window.
+        STATE.log_store.flush()
+        settled = not generator.is_alive() and report.served_total + last["rejected"] + last["dropped"] + last["shed"] >= report.offered
+        if now >= end or (now >= start + duration and settled):
+            break
+    stop.set()
+    elapsed = time.perf_counter() - start
+    latency = report.latency.summary()
+
+    return {
+        "pattern": pattern,
+        "rate": rate,
+        "ramp_to": (ramp_to or rate * 10) if pattern == "ramp" else None,
+        "duration": duration,
+        "senders": senders,
+        "workers": STATE.hub_workers,
+        "wire_format": wire_format,
+        "link_latency": list(STATE.link_latency),
+        "offered": report.offered,
+        "served": report.served_total,
+        "rejected": dict(report.rejected),
+        "dropped": last["dropped"],
+        "shed": last["shed"],
+        "queued": STATE.packet_queue.qsize(),
+        "offered_per_sec": round(report.offered / duration, 1),
+        "served_per_sec": round(report.served_total / elapsed, 1),
+        "latency_ms": {k[:-len("_us")]: v / 1000 for k, v in latency.items() if k != "sum_us" and k.endswith("_us")},
+        "statuses": dict(STATE.status_counts),
+        "saturation": report.saturation(),
+        "windows": report.windows,
+    }
+
+def print_table(summary):
+    print(f"{'T(s)':>6} {'OFFER/s':>9} {'SERVE/s':>9} {'REJECT':>7} {'QUEUE':>7} {'DROP':>6} {'SHED':>6} {'P50 ms':>8} {'P99 ms':>8}")
+    for row in summary["windows"]:
+        print(f"{row['t']:>6.1f} {row['offered_per_sec']:>9.0f} {row['served_per_sec']:>9.0f} {row['rejected']:>7} {row['queue_depth']:>7} {row['dropped']:>6} {row['shed']:>6} {row['p50_ms']:>8.1f} {row['p99_ms']:>8.1f}")
+    saturation = summary["saturation"]
+    if saturation:
+        print(f"\nSaturated at t={saturation['at_seconds']}s: offered {saturation['offered_per_sec']:.0f}/s, served {saturation['served_per_sec']:.0f}/s")
+    else:
+        peak = max((row["offered_per_sec"] for row in summary["windows"]), default=0)
+        print(f"\nNo saturation: the queue kept draining at up to {peak:.0f}/s offered")
+
+def positive(value):
+    value = float(value)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return value
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the hub with open-loop traffic and find where it saturates")
+    parser.add_argument("--pattern", choices=PATTERNS, default="constant")
+    parser.add_argument("--rate", type=positive, default=100.0, help="packets per second (start rate for ramp)")
+    parser.add_argument("--ramp-to", type=positive, help="final rate for ramp (default 10x --rate)")
+    parser.add_argument("--duration", type=positive, default=30.0)
+    parser.add_argument("--window", type=positive, default=1.0, help="report window in seconds")
+    parser.add_argument("--senders", type=int, default=16)
+    parser.add_argument("--hack-prob", type=float, default=0.0)
+    parser.add_argument("--wire-format", choices=["binary", "json"], default="binary")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--queue-capacity", type=int)
+    parser.add_argument("--policy", choices=POLICIES)
+    parser.add_argument("--no-link-latency", action="store_true", help="skip the simulated link delay and measure verification alone")
+    parser.add_argument("--admission", action="store_true", help="keep per-sender admission control on")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the report JSON here")
+    args = parser.parse_args()
+
+    if args.queue_capacity:
+        STATE.packet_queue.capacity = args.queue_capacity
+    if args.policy:
+        STATE.packet_queue.policy = args.policy
+
+    summary = run(
+        args.pattern, args.rate, args.duration, args.ramp_to, args.window,
+        args.senders, args.hack_prob, args.wire_format, args.workers,
+        args.batch_size, not args.no_link_latency, args.admission, args.seed
+    )
+    print_table(summary)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(json.dumps(summary, indent=2))
+    replayed = summary["rejected"].get("Replay Detected", 0)
+    if replayed:
+        # Replays are rejected before any signature work, so the run did not measure verification.
+        sys.exit(f"{replayed} packets were rejected as replays; the throughput above is not verification throughput")
+
+if __name__ == "__main__":
+    main()
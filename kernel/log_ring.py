@@ -0,0 +1,51 @@
+import itertools
+import threading
+from collections import Counter
+
+class LogRing:
+    # Fixed-size ring of log entries. Writers claim a sequence number and
+    # overwrite one slot; readers copy the slot list and sort it. Both are
+    # single bytecode-level operations under the GIL, so neither side locks.
+    # Status counters are kept per producer thread and summed on read.
+
+    def __init__(self, capacity=50):
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._seq = itertools.count()
+        self._local = threading.local()
+        self._counters = []
+
+    def append(self, entry):
+        seq = next(self._seq)
+        self._slots[seq % self.capacity] = (seq, entry)
+        counter = getattr(self._local, "counter", None)
+        if counter is None:
+            counter = self._local.counter = Counter()
+            self._counters.append(counter)
+        counter[entry["Status"]] += 1
+
+    def restore(self, entries, counts):
+        # Refills the ring (newest first, as recent() returns it) and carries
+        # the status totals over without recounting.
+        for entry in reversed(entries[:self.capacity]):
+            seq = next(self._seq)
+            self._slots[seq % self.capacity] = (seq, entry)
+        self._counters.append(Counter(counts))
+
+    def recent(self):
+        slots = [slot for slot in self._slots[:] if slot is not None]
+        slots.sort(key=lambda slot: slot[0], reverse=True)
+        return [entry for _, entry in slots]
+
+    @property
+    def version(self):
+        return max((slot[0] + 1 for slot in self._slots[:] if slot is not None), default=0)
+
+    def counts(self):
+        total = Counter()
+        for counter in self._counters[:]:
+            total.update(dict.copy(counter))
+        return total
+
+    def __len__(self):
+        return sum(slot is not None for slot in self._slots[:])
@@ -0,0 +1,274 @@
+import glob
+import os
+import queue
+import struct
+import threading
+from datetime import datetime
+import numpy as np
+
+LOG_DIR = os.environ.get("CATENATE_LOG_DIR", "logs")
+SEGMENT_RECORDS = 1 << 16
+PAYLOAD_BYTES = 96
+STRINGS_FILE = "strings.bin"
+LEGACY_STRINGS_FILE = "strings.txt"
+# String table entries are length-prefixed UTF-8, so any character a
+# sender puts in a field survives a reload without shifting the codes.
+_STRING_LEN = struct.Struct("<I")
+
+# Fixed-width records so a segment file is just a memory-mapped array.
+# Sender, type and status are codes into an append-only string table.
+RECORD = np.dtype([
+    ("ts", "<f8"),
+    ("sender", "<u4"),
+    ("type", "<u4"),
+    ("status", "<u4"),
+    ("payload", f"S{PAYLOAD_BYTES}"),
+])
+INDEXED = ("sender", "type", "status")
+
+class _Segment:
+    # A sealed segment carries a sorted index per column (row order plus the
+    # start offset of each code). The active one is small enough to scan.
+
+    def __init__(self, path, create=False):
+        self.path = path
+        if create:
+            with open(path, "wb") as f:
+                f.truncate(SEGMENT_RECORDS * RECORD.itemsize)
+        self.rows = np.memmap(path, dtype=RECORD, mode="r+")
+        empty = self.rows["ts"] == 0
+        self.count = int(np.argmax(empty)) if empty.any() else len(self.rows)
+        ts = self.rows["ts"][:self.count]
+        self.t_min = float(ts.min()) if self.count else None
+        self.t_max = float(ts.max()) if self.count else None
+        self._index = None
+
+    @property
+    def index_path(self):
+        return self.path[:-len(".rec")] + ".idx.npz"
+
+    @property
+    def full(self):
+        return self.count >= len(self.rows)
+
+    def write(self, records):
+        n = len(records)
+        self.rows[self.count:self.count + n] = records
+        lo, hi = float(records["ts"].min()), float(records["ts"].max())
+        self.t_min = lo if self.t_min is None else min(self.t_min, lo)
+        self.t_max = hi if self.t_max is None else max(self.t_max, hi)
+        self.count += n
+
+    def seal(self):
+        self.rows.flush()
+        columns = {}
+        for col in INDEXED:
+            values = self.rows[col][:self.count]
+            order = np.argsort(values, kind="stable").astype(np.uint32)
+            keys, starts = np.unique(values[order], return_index=True)
+            columns[f"{col}_order"] = order
+            columns[f"{col}_keys"] = keys
+            columns[f"{col}_starts"] = np.append(starts, self.count).astype(np.uint32)
+        np.savez(self.index_path, **columns)
+
+    def _rows_for(self, col, code):
+        if self._index is None:
+            if not os.path.exists(self.index_path):
+                return np.flatnonzero(self.rows[col][:self.count] == code)
+            self._index = np.load(self.index_path)
+        keys = self._index[f"{col}_keys"]
+        i = int(np.searchsorted(keys, code))
+        if i >= len(keys) or keys[i] != code:
+            return np.empty(0, dtype=np.int64)
+        starts = self._index[f"{col}_starts"]
+        return np.sort(self._index[f"{col}_order"][starts[i]:starts[i + 1]])
+
+    def match(self, filters, since=None, until=None):
+        if not self.full:
+            mask = np.ones(self.count, dtype=bool)
+            for col, code in filters.items():
+                mask &= self.rows[col][:self.count] == code
+            rows = np.flatnonzero(mask)
+        elif filters:
+            rows = None
+            for col, code in filters.items():
+                hit = self._rows_for(col, code)
+                rows = hit if rows is None else np.intersect1d(rows, hit, assume_unique=True)
+        else:
+            rows = np.arange(self.count)
+
+        if since is not None or until is not None:
+            ts = self.rows["ts"][rows]
+            keep = np.ones(len(rows), dtype=bool)
+            if since is not None:
+                keep &= ts >= since
+            if until is not None:
+                keep &= ts <= until
+            rows = rows[keep]
+        return rows
+
+class LogStore:
+    # Append-only traffic history split into fixed-size memory-mapped
+    # segments. Producers only enqueue; flush() is the single writer.
+
+    def __init__(self, log_dir=LOG_DIR):
+        self.log_dir = log_dir
+        os.makedirs(log_dir, exist_ok=True)
+        self._pending = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self.version = 0
+
+        self._strings = []
+        self._codes = {}
+        self._strings_file = self._open_strings(os.path.join(log_dir, STRINGS_FILE))
+
+        self._segments = [_Segment(path) for path in sorted(glob.glob(os.path.join(log_dir, "segment-*.rec")))]
+        if not self._segments or self._segments[-1].full:
+            self._new_segment()
+
+    def __len__(self):
+        return sum(seg.count for seg in self._segments) + self._pending.qsize()
+
+    def _open_strings(self, path):
+        legacy = os.path.join(self.log_dir, LEGACY_STRINGS_FILE)
+        if not os.path.exists(path) and os.path.exists(legacy):
+            # Older stores kept one string per line; carry them over once.
+            with open(legacy, encoding="utf-8", newline="\n") as f:
+                strings = [line[:-1] if line.endswith("\n") else line for line in f]
+            with open(path + ".tmp", "wb") as f:
+                f.write(b"".join(self._pack_string(value) for value in strings))
+            os.replace(path + ".tmp", path)
+
+        good = 0
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+            while good + _STRING_LEN.size <= len(data):
+                (length,) = _STRING_LEN.unpack_from(data, good)
+                end = good + _STRING_LEN.size + length
+                if end > len(data):
+                    break
+                self._intern(data[good + _STRING_LEN.size:end].decode("utf-8"))
+                good = end
+        f = open(path, "ab")
+        # A torn entry at the tail (crash mid-write) is cut off so new
+        # entries do not land behind it.
+        f.truncate(good)
+        return f
+
+    @staticmethod
+    def _pack_string(value):
+        raw = value.encode("utf-8")
+        return _STRING_LEN.pack(len(raw)) + raw
+
+    def _intern(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self._strings)
+            self._strings.append(value)
+            return code, True
+        return code, False
+
+    def _code(self, value):
+        code, new = self._intern(str(value))
+        if new:
+            self._strings_file.write(self._pack_string(self._strings[code]))
+        return code
+
+    def _new_segment(self):
+        path = os.path.join(self.log_dir, f"segment-{len(self._segments):06d}.rec")
+        self._segments.append(_Segment(path, create=True))
+
+    def append(self, ts, sender, type_, content, status):
+        self._pending.put((ts, sender, type_, content, status))
+
+    def flush(self):
+        with self._lock:
+            batch = []
+            while True:
+                try:
+                    batch.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return 0
+
+            records = np.zeros(len(batch), dtype=RECORD)
+            records["ts"] = [entry[0] for entry in batch]
+            records["sender"] = [self._code(entry[1]) for entry in batch]
+            records["type"] = [self._code(entry[2]) for entry in batch]
+            records["status"] = [self._code(entry[4]) for entry in batch]
+            records["payload"] = [str(entry[3]).encode("utf-8")[:PAYLOAD_BYTES] for entry in batch]
+            self._strings_file.flush()
+
+            written = 0
+            while written < len(records):
+                seg = self._segments[-1]
+                room = len(seg.rows) - seg.count
+                seg.write(records[written:written + room])
+                written += min(room, len(records) - written)
+                if seg.full:
+                    seg.seal()
+                    self._new_segment()
+
+            self.version += len(batch)
+            return len(batch)
+
+    def _filters(self, sender, type_, status):
+        filters = {}
+        for col, value in (("sender", sender), ("type", type_), ("status", status)):
+            if value is None:
+                continue
+            code = self._codes.get(value)
+            if code is None:
+                return None
+            filters[col] = code
+        return filters
+
+    def _entry(self, record):
+        return {
+            "Time": datetime.fromtimestamp(float(record["ts"])).strftime("%H:%M:%S"),
+            "ID": self._strings[record["sender"]],
+            "Type": self._strings[record["type"]],
+            "Payload": record["payload"].decode("utf-8", "ignore"),
+            "Status": self._strings[record["status"]],
+        }
+
+    def _segments_for(self, since, until):
+        for seg in reversed(self._segments):
+            if not seg.count:
+                continue
+            if since is not None and seg.t_max < since:
+                continue
+            if until is not None and seg.t_min > until:
+                continue
+            yield seg
+
+    def query(self, sender=None, type_=None, status=None, since=None, until=None, limit=50, offset=0):
+        # Newest first. Offset paging walks segments from the tail, so
+        # recent pages only touch the last segment or two.
+        self.flush()
+        filters = self._filters(sender, type_, status)
+        if filters is None:
+            return []
+
+        results = []
+        for seg in self._segments_for(since, until):
+            rows = seg.match(filters, since, until)[::-1]
+            if offset >= len(rows):
+                offset -= len(rows)
+                continue
+            take = rows[offset:offset + limit - len(results)]
+            offset = 0
+            results.extend(self._entry(record) for record in seg.rows[take])
+            if len(results) >= limit:
+                break
+        return results
+
+    def count(self, sender=None, type_=None, status=None, since=None, until=None):
+        self.flush()
+        filters = self._filters(sender, type_, status)
+        if filters is None:
+            return 0
+        return sum(len(seg.match(filters, since, until)) for seg in self._segments_for(since, until))
+
@@ -0,0 +1,141 @@
+import math
+from collections import defaultdict
+import numpy as np
+
+HUB = -1
+NO_ROUTE = -2
+
+class SpatialGrid:
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = defaultdict(set)
+        self.cell_of = {}
+
+    def _cell(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def place(self, slot, x, y):
+        cell = self._cell(x, y)
+        old = self.cell_of.get(slot)
+        if old == cell:
+            return
+        if old is not None:
+            self.cells[old].discard(slot)
+        self.cells[cell].add(slot)
+        self.cell_of[slot] = cell
+
+    def remove(self, slot):
+        old = self.cell_of.pop(slot, None)
+        if old is not None:
+            self.cells[old].discard(slot)
+
+    def near(self, x, y):
+        return self.around(self._cell(x, y))
+
+    def around(self, cell):
+        cx, cy = cell
+        found = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                members = self.cells.get((cx + dx, cy + dy))
+                if members:
+                    found.extend(members)
+        return found
+
+class MeshRouter:
+    # Routes are a BFS tree rooted at the hub: each unit stores its next hop
+    # (HUB, another slot, or NO_ROUTE). The tree is only recomputed when
+    # positions, liveness or ranges change between syncs.
+
+    def __init__(self):
+        self.grid = SpatialGrid(1.0)
+        self.version = 0
+        self.links = []
+        self._x = np.empty(0)
+        self._y = np.empty(0)
+        self._alive = np.empty(0, dtype=bool)
+        self._params = None
+
+    def sync(self, fleet, max_range, link_range):
+        n = fleet.size
+        x, y, alive = fleet.x[:n], fleet.y[:n], fleet.alive[:n]
+        cell_size = max(link_range, 1.0)
+
+        if cell_size != self.grid.cell_size:
+            self.grid = SpatialGrid(cell_size)
+            changed = np.ones(n, dtype=bool)
+        else:
+            m = min(len(self._x), n)
+            changed = np.ones(n, dtype=bool)
+            changed[:m] = (x[:m] != self._x[:m]) | (y[:m] != self._y[:m]) | (alive[:m] != self._alive[:m])
+
+        for slot in np.flatnonzero(changed):
+            if alive[slot]:
+                self.grid.place(slot, x[slot], y[slot])
+            else:
+                self.grid.remove(slot)
+
+        params = (max_range, link_range)
+        if not changed.any() and params == self._params:
+            return False
+
+        self._x, self._y, self._alive = x.copy(), y.copy(), alive.copy()
+        self._params = params
+        self._route(fleet, n, max_range, link_range)
+        self.version += 1
+        return True
+
+    def _route(self, fleet, n, max_range, link_range):
+        x, y, alive = self._x, self._y, self._alive
+        next_hop = np.full(n, NO_ROUTE, dtype=np.int32)
+        hops = np.zeros(n, dtype=np.int16)
+
+        frontier = np.flatnonzero(alive & (np.hypot(x, y) <= max_range))
+        next_hop[frontier] = HUB
+        hops[frontier] = 1
+        visited = next_hop != NO_ROUTE
+        reach2 = link_range ** 2
+
+        level = 1
+        while frontier.size and link_range > 0:
+            # Expand the frontier one grid cell at a time: each cell only looks
+            # at its 3x3 neighbourhood, never the whole fleet.
+            cells = np.floor(np.column_stack([x[frontier], y[frontier]]) / self.grid.cell_size).astype(np.int64)
+            keys, group = np.unique(cells, axis=0, return_inverse=True)
+            order = np.argsort(group.ravel(), kind="stable")
+            bounds = np.searchsorted(group.ravel()[order], np.arange(len(keys) + 1))
+
+            reached = []
+            for k, cell in enumerate(keys):
+                cand = self.grid.around((int(cell[0]), int(cell[1])))
+                if not cand:
+                    continue
+                cand = np.array(cand, dtype=np.int64)
+                cand = cand[~visited[cand]]
+                if not cand.size:
+                    continue
+
+                members = frontier[order[bounds[k]:bounds[k + 1]]]
+                d2 = (x[cand][None, :] - x[members][:, None]) ** 2 + (y[cand][None, :] - y[members][:, None]) ** 2
+                in_reach = d2 <= reach2
+                hit = in_reach.any(axis=0)
+                if not hit.any():
+                    continue
+
+                cand = cand[hit]
+                visited[cand] = True
+                next_hop[cand] = members[in_reach[:, hit].argmax(axis=0)]
+                hops[cand] = level + 1
+                reached.append(cand)
+            frontier = np.concatenate(reached) if reached else np.empty(0, dtype=np.int64)
+            level += 1
+
+        fleet.next_hop[:n] = next_hop
+        fleet.hops[:n] = hops
+        fleet.version += 1
+
+        ids = fleet.ids
+        self.links = [
+            (ids[slot], "CENTRAL_HUB" if parent == HUB else ids[parent])
+            for slot, parent in zip(np.flatnonzero(next_hop != NO_ROUTE), next_hop[next_hop != NO_ROUTE])
+        ]
@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+
+METRICS_PORT = int(os.environ.get("CATENATE_METRICS_PORT", "9108"))
+STAGES = ("generate", "encrypt", "sign", "queue_wait", "timestamp_check", "verify_signature", "decrypt", "log")
+
+# Log-linear buckets in microseconds, HdrHistogram style: exact below 32us,
+# then 16 linear sub-buckets per power of two (at most ~6% relative error).
+_SUB_BITS = 4
+_SUB = 1 << _SUB_BITS
+_BUCKETS = 64 * _SUB
+
+def _bucket(us):
+    if us < 2 * _SUB:
+        return us
+    shift = us.bit_length() - _SUB_BITS - 1
+    return (shift + 1) * _SUB + (us >> shift) - _SUB
+
+def _bucket_floor(index):
+    if index < 2 * _SUB:
+        return index
+    shift = index // _SUB - 1
+    return (index % _SUB + _SUB) << shift
+
+class LatencyHistogram:
+    # One shard per recording thread so record() never contends; readers
+    # merge the shards.
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = [[0] * _BUCKETS, 0, 0, 0]
+            self._shards.append(shard)
+        return shard
+
+    def record(self, us):
+        shard = self._shard()
+        shard[0][min(_bucket(us), _BUCKETS - 1)] += 1
+        shard[1] += 1
+        shard[2] += us
+        if us > shard[3]:
+            shard[3] = us
+
+    def merged(self):
+        counts = [0] * _BUCKETS
+        total = total_us = peak = 0
+        for buckets, count, sum_us, max_us in self._shards[:]:
+            for i, c in enumerate(buckets):
+                if c:
+                    counts[i] += c
+            total += count
+            total_us += sum_us
+            peak = max(peak, max_us)
+        return counts, total, total_us, peak
+
+    def summary(self, quantiles=(0.5, 0.9, 0.99)):
+        counts, total, total_us, peak = self.merged()
+        result = {"count": total, "sum_us": total_us, "max_us": peak}
+        for q in quantiles:
+            target, seen, value = q * total, 0, 0
+            for i, c in enumerate(counts):
+                seen += c
+                if c and seen >= target:
+                    value = _bucket_floor(i)
+                    break
+            result[f"p{round(q * 100):g}_us"] = value
+        return result
+
+    def buckets(self):
+        counts, total, total_us, _ = self.merged()
+        cumulative, out = 0, []
+        for i, c in enumerate(counts):
+            if c:
+                cumulative += c
+                out.append((_bucket_floor(i + 1), cumulative))
+        return out, total, total_us
+
+class Metrics:
+    # Hooks call start() and observe(). While disabled start() returns 0 and
+    # observe() bails on that, so an uninstrumented run pays two cheap calls.
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.stages = {stage: LatencyHistogram() for stage in STAGES}
+        self._server = None
+
+    def start(self):
+        return time.perf_counter_ns() if self.enabled else 0
+
+    def observe(self, stage, started):
+        if started:
+            self.stages[stage].record((time.perf_counter_ns() - started) // 1000)
+
+    def reset(self):
+        self.stages = {stage: LatencyHistogram() for stage in STAGES}
+
+    def summary(self):
+        return {stage: hist.summary() for stage, hist in self.stages.items()}
+
+    def prometheus(self, counters=None):
+        lines = [
+            "# HELP catenate_stage_latency_seconds Per-stage packet pipeline latency.",
+            "# TYPE catenate_stage_latency_seconds histogram",
+        ]
+        for stage, hist in self.stages.items():
+            buckets, total, total_us = hist.buckets()
+            for upper_us, cumulative in buckets:
+                lines.append(f'catenate_stage_latency_seconds_bucket{{stage="{stage}",le="{upper_us / 1e6:g}"}} {cumulative}')
+            lines.append(f'catenate_stage_latency_seconds_bucket{{stage="{stage}",le="+Inf"}} {total}')
+            lines.append(f'catenate_stage_latency_seconds_sum{{stage="{stage}"}} {total_us / 1e6:g}')
+            lines.append(f'catenate_stage_latency_seconds_count{{stage="{stage}"}} {total}')
+        for name, (help_text, values) in (counters or {}).items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in values.items():
+                lines.append(f"{name}{{{labels}}} {value}" if labels else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, counters=lambda: {}, port=METRICS_PORT):
+        if self._server is not None:
+            return self._server
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus(counters()).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="MetricsServer", daemon=True).start()
+        return self._server
+
+METRICS = Metrics(enabled=os.environ.get("CATENATE_METRICS", "") == "1")
@@ -0,0 +1,91 @@
+import itertools
+import threading
+from collections import Counter, deque
+from .metrics import METRICS
+
+POLICIES = ("drop-oldest", "drop-lowest", "block")
+
+class PriorityPacketQueue:
+    # One FIFO lane per priority (0 = most urgent). The hub drains lanes in
+    # priority order; when the queue is full the overflow policy decides who
+    # loses: the oldest packet overall, the least urgent one, or the sender.
+
+    def __init__(self, capacity=2048, policy="drop-lowest"):
+        self.capacity = capacity
+        self.policy = policy
+        self._lanes = {}
+        self._size = 0
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self.dropped = Counter()
+        self.refused = 0
+        # Called with (packet, priority) for every accepted packet, e.g. by a capture.
+        self.tap = None
+
+    def _lane(self, priority):
+        lane = self._lanes.get(priority)
+        if lane is None:
+            lane = self._lanes[priority] = deque()
+            self._lanes = dict(sorted(self._lanes.items()))
+        return lane
+
+    def _evict(self, priority):
+        if self.policy == "drop-oldest":
+            victim = min((lane[0][0], p) for p, lane in self._lanes.items() if lane)[1]
+        else:
+            victim = max(p for p, lane in self._lanes.items() if lane)
+            if victim < priority:
+                # Everything queued is more urgent than the newcomer.
+                self.dropped[priority] += 1
+                return False
+        self._lanes[victim].popleft()
+        self._size -= 1
+        self.dropped[victim] += 1
+        return True
+
+    def put(self, packet, priority=0, timeout=0.0):
+        with self._cond:
+            if self._size >= self.capacity:
+                if self.policy == "block":
+                    # Scheduler-driven senders must not stall the shared thread,
+                    # so the default is to refuse and let them back off.
+                    if not timeout or not self._cond.wait_for(lambda: self._size < self.capacity, timeout):
+                        self.refused += 1
+                        return False
+                elif not self._evict(priority):
+                    return False
+            self._lane(priority).append((next(self._seq), METRICS.start(), packet))
+            self._size += 1
+            self._cond.notify_all()
+        # Outside the lock, so a tap never holds up the hub or other senders.
+        if self.tap is not None:
+            self.tap(packet, priority)
+        return True
+
+    def drain(self, n, timeout=None):
+        with self._cond:
+            if timeout is not None and not self._cond.wait_for(lambda: self._size, timeout):
+                return []
+            batch = []
+            for lane in self._lanes.values():
+                while lane and len(batch) < n:
+                    _, enqueued, packet = lane.popleft()
+                    METRICS.observe("queue_wait", enqueued)
+                    batch.append(packet)
+                if len(batch) >= n:
+                    break
+            self._size -= len(batch)
+            if batch:
+                self._cond.notify_all()
+            return batch
+
+    def qsize(self):
+        return self._size
+
+    def stats(self):
+        with self._cond:
+            return {
+                "depth": {p: len(lane) for p, lane in self._lanes.items()},
+                "dropped": dict(self.dropped),
+                "refused": self.refused,
+            }
@@ -0,0 +1,144 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+
+RULES_PATH = os.environ.get("CATENATE_RULES", os.path.join("rules", "malware.json"))
+RELOAD_INTERVAL = 1.0
+ANY_TYPE = "*"
+
+class Rule:
+    __slots__ = ("index", "name", "category", "status", "types", "patterns", "regex")
+
+    def __init__(self, index, spec):
+        self.index = index
+        self.name = spec["name"]
+        self.category = spec.get("category", "MALWARE")
+        self.status = spec.get("status", "BLOCKED")
+        self.types = tuple(spec.get("types", [ANY_TYPE]))
+        self.patterns = tuple(spec.get("patterns", []))
+        self.regex = tuple(spec.get("regex", []))
+        for expr in self.regex:
+            re.compile(expr)
+
+def _automaton(literals):
+    # Aho-Corasick over the literal patterns. Each state remembers the
+    # lowest rule index of any literal ending there (fail links included),
+    # so one pass over the payload sees every hit, overlapping ones too.
+    goto = [{}]
+    best = [None]
+    for literal, index in literals.items():
+        state = 0
+        for ch in literal:
+            nxt = goto[state].get(ch)
+            if nxt is None:
+                nxt = goto[state][ch] = len(goto)
+                goto.append({})
+                best.append(None)
+            state = nxt
+        if best[state] is None or index < best[state]:
+            best[state] = index
+
+    fail = [0] * len(goto)
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for ch, nxt in goto[state].items():
+            queue.append(nxt)
+            f = fail[state]
+            while f and ch not in goto[f]:
+                f = fail[f]
+            fail[nxt] = goto[f].get(ch, 0)
+            inherited = best[fail[nxt]]
+            if inherited is not None and (best[nxt] is None or inherited < best[nxt]):
+                best[nxt] = inherited
+    return goto, fail, best
+
+class _Matcher:
+    # Per message type: one automaton for every literal plus the regex
+    # rules in file order. A payload is scanned once for literals; regexes
+    # only run while they could still beat the best literal hit, and on
+    # several hits the rule listed first in the file wins.
+
+    def __init__(self, rules):
+        self.rules = {rule.index: rule for rule in rules}
+        literals = {}
+        for rule in rules:
+            for literal in rule.patterns:
+                if literal and literal not in literals:
+                    literals[literal] = rule.index
+        self.goto, self.fail, self.best = _automaton(literals)
+        self.regexes = [(rule.index, re.compile("|".join(f"(?:{expr})" for expr in rule.regex))) for rule in rules if rule.regex]
+
+    def match(self, content):
+        goto, fail, best = self.goto, self.fail, self.best
+        found = None
+        state = 0
+        for ch in content:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            index = best[state]
+            if index is not None and (found is None or index < found):
+                found = index
+                if found == 0:
+                    break
+        for index, regex in self.regexes:
+            if found is not None and index >= found:
+                break
+            if regex.search(content):
+                found = index
+                break
+        return None if found is None else self.rules[found]
+
+class RuleEngine:
+    def __init__(self, path=RULES_PATH):
+        self.path = path
+        self.rules = []
+        self.error = None
+        self._matchers = {}
+        self._fallback = _Matcher([])
+        self._mtime = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        with self._lock:
+            try:
+                mtime = os.path.getmtime(self.path)
+                with open(self.path, encoding="utf-8") as f:
+                    rules = [Rule(i, spec) for i, spec in enumerate(json.load(f))]
+            except (OSError, ValueError, KeyError, re.error) as e:
+                # Keep serving the last good rule set.
+                self.error = f"{type(e).__name__}: {e}"
+                return False
+
+            types = {t for rule in rules for t in rule.types} - {ANY_TYPE}
+            wildcard = [rule for rule in rules if ANY_TYPE in rule.types]
+            matchers = {t: _Matcher([rule for rule in rules if ANY_TYPE in rule.types or t in rule.types]) for t in types}
+
+            self.rules = rules
+            self._matchers = matchers
+            self._fallback = _Matcher(wildcard)
+            self._mtime = mtime
+            self.error = None
+            return True
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked < RELOAD_INTERVAL:
+            return
+        self._checked = now
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.reload()
+
+    def classify(self, msg_type, content):
+        self._maybe_reload()
+        return self._matchers.get(msg_type, self._fallback).match(content)
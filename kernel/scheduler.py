@@ -0,0 +1,62 @@
+import heapq
+import itertools
+import threading
+from .clock import WALL_CLOCK
+
+class FleetScheduler(threading.Thread):
+    # Every unit is a generator that yields "sleep for N seconds"; one heap of
+    # wake-up times replaces one OS thread per unit.
+
+    def __init__(self, clock=WALL_CLOCK):
+        super().__init__()
+        self.name = "FleetScheduler"
+        self.daemon = True
+        self.clock = clock
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def schedule(self, task, delay=0.0):
+        with self._cond:
+            heapq.heappush(self._heap, (self.clock.monotonic() + delay, next(self._seq), task))
+            self._cond.notify()
+
+    def run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                wait = self._heap[0][0] - self.clock.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                now = self.clock.monotonic()
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    due.append(heapq.heappop(self._heap)[2])
+
+            for task in due:
+                self._step(task)
+
+    def run_until(self, deadline):
+        # Virtual-clock mode: jump straight to each event instead of waiting for it.
+        while True:
+            with self._cond:
+                if not self._heap or self._heap[0][0] > deadline:
+                    break
+                due, _, task = heapq.heappop(self._heap)
+            self.clock.advance_to(due)
+            self._step(task)
+        self.clock.advance_to(deadline)
+
+    def _step(self, task):
+        try:
+            delay = next(task)
+        except StopIteration:
+            return
+        except Exception:
+            return
+        self.schedule(task, max(0.0, delay or 0.0))
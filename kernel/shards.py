@@ -0,0 +1,364 @@
+import base64
+import bisect
+import hashlib
+import json
+import multiprocessing
+import socket
+import struct
+import threading
+import time
+from cryptography.hazmat.primitives import serialization
+from protocols.network_extensions import OptimizedNode
+from protocols.replay import ReplayGuard
+from protocols.session import SessionKey
+from protocols.wire import FrameError, decode_frame, peek_sender_index
+from .hub_pipeline import classify_entries, verify_packet
+from .rules import RULES_PATH, RuleEngine
+
+# Dashboard <-> shard messages over one localhost TCP connection per shard:
+#   kind u8 | body length u32 | body
+# FRAME bodies are binary wire frames as the bots sent them; everything
+# else is JSON.
+_MSG = struct.Struct("<BI")
+HELLO, CONFIG, PEER, SESSION, FRAME, PACKET, RESULTS = range(1, 8)
+RECV_BYTES = 1 << 20
+SHARD_VNODES = 160
+
+def _message(kind, body):
+    return _MSG.pack(kind, len(body)) + body
+
+def _split(buffer):
+    # Pops every complete message off the front of buffer.
+    messages, offset = [], 0
+    while len(buffer) - offset >= _MSG.size:
+        kind, length = _MSG.unpack_from(buffer, offset)
+        end = offset + _MSG.size + length
+        if end > len(buffer):
+            break
+        messages.append((kind, bytes(buffer[offset + _MSG.size:end])))
+        offset = end
+    del buffer[:offset]
+    return messages
+
+def _recv_exact(conn, size):
+    data = b""
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("shard closed the connection")
+        data += chunk
+    return data
+
+def _ring_hash(key):
+    return int.from_bytes(hashlib.blake2b(str(key).encode("utf-8"), digest_size=8).digest(), "little")
+
+class HashRing:
+    # Consistent hashing: every shard owns `vnodes` points on a 64-bit ring
+    # and a sender belongs to the next point clockwise, so resizing the ring
+    # only moves about 1/N of the senders.
+
+    def __init__(self, nodes, vnodes=SHARD_VNODES):
+        points = sorted((_ring_hash(f"{node}#{i}"), node) for node in nodes for i in range(vnodes))
+        self._hashes = [h for h, _ in points]
+        self._nodes = [node for _, node in points]
+        self._owners = {}
+
+    def node_for(self, key):
+        node = self._owners.get(key)
+        if node is None:
+            i = bisect.bisect(self._hashes, _ring_hash(key)) % len(self._hashes)
+            node = self._owners[key] = self._nodes[i]
+        return node
+
+def peer_message(peer_id, slot, public_key):
+    der = public_key.public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return PEER, json.dumps({"id": peer_id, "slot": slot, "key": base64.b64encode(der).decode("utf-8")}).encode("utf-8")
+
+def session_message(session):
+    return SESSION, json.dumps(session.export()).encode("utf-8")
+
+def packet_message(item):
+    # Queue items as the bots produced them: binary frames travel untouched.
+    if isinstance(item, (bytes, bytearray, memoryview)):
+        return FRAME, bytes(item)
+    return PACKET, item.to_json().encode("utf-8")
+
+class HubCore:
+    # A self-contained hub: the verify/classify pipeline with its own replay
+    # window, peer directory and sessions, driven by the messages above.
+    # Shard processes and the capture replayer both run one.
+
+    def __init__(self, network_key, scheme, rules_path):
+        self.known = {}
+        self.slots = {}
+        self.strict_replay = True
+        self.hub = OptimizedNode("CENTRAL_HUB", network_key, scheme, peer_loader=self.known.get)
+        self.replay_guard = ReplayGuard()
+        self.rules = RuleEngine(rules_path)
+
+    def resolve_peer(self, sender_id):
+        if sender_id not in self.known:
+            return None, ("SEC", "Unknown Signal Source", "BLOCKED")
+        keys = self.hub.vault.peers.get(sender_id)
+        if not keys:
+            return None, ("SEC", "No Key Found", "REJECTED")
+        return keys, None
+
+    def handle(self, kind, body):
+        if kind == CONFIG:
+            self.strict_replay = json.loads(body)["strict_replay"]
+        elif kind == PEER:
+            peer = json.loads(body)
+            keys = (serialization.load_der_public_key(base64.b64decode(peer["key"])),)
+            self.known[peer["id"]] = keys
+            self.slots[peer["slot"]] = peer["id"]
+            self.hub.vault.peers.put(peer["id"], keys)
+        elif kind == SESSION:
+            self.hub.install_session(SessionKey.restore(json.loads(body)))
+        elif kind == FRAME:
+            try:
+                packet = decode_frame(body, lambda index: self.slots.get(index, "UNKNOWN"))
+            except FrameError:
+                return [["SEC", "Malformed Frame", "REJECTED", "UNKNOWN"]]
+            return self.process(packet)
+        elif kind == PACKET:
+            from protocols.packet import DataPacket
+            try:
+                packet = DataPacket.model_validate_json(body)
+            except ValueError:
+                return [["SEC", "Malformed Packet", "REJECTED", "UNKNOWN"]]
+            return self.process(packet)
+        return None
+
+    def process(self, packet):
+        # One packet can carry a bundle, so the result is a list of rows.
+        data, rejection = verify_packet(packet, self.hub, self.replay_guard, self.resolve_peer, time.time(), self.strict_replay)
+        if rejection:
+            return [[*rejection, packet.sender_id]]
+        return [[*row, packet.sender_id] for row in classify_entries(data, self.rules)]
+
+def shard_main(index, port, network_key, scheme, rules_path=RULES_PATH):
+    # Spawn target. Everything that arrives in one recv is verified before a
+    # single RESULTS message goes back, so results stream in batches. The
+    # body holds one list of rows per packet.
+    shard = HubCore(network_key, scheme, rules_path)
+    conn = socket.create_connection(("127.0.0.1", port))
+    conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    conn.sendall(_message(HELLO, str(index).encode("utf-8")))
+
+    buffer = bytearray()
+    with conn:
+        while True:
+            try:
+                chunk = conn.recv(RECV_BYTES)
+            except OSError:
+                break
+            if not chunk:
+                break
+            buffer += chunk
+            results = [r for r in (shard.handle(kind, body) for kind, body in _split(buffer)) if r]
+            if results:
+                conn.sendall(_message(RESULTS, json.dumps(results).encode("utf-8")))
+
+class ShardedHub:
+    # Verification spread over `count` hub processes. Senders are assigned
+    # by consistent hashing, so each sender's replay window and sessions
+    # live on exactly one shard. Result rows [type, content, status, sender]
+    # come back on the same sockets and are handed to on_results.
+    #
+    # A shard whose socket fails or closes is dropped from the ring: its
+    # senders' keys and sessions are re-sent to their new owners and
+    # on_down(index, lost) reports the packets that died with it. Once no
+    # shard is left, dispatch hands everything back to the caller.
+
+    def __init__(self, count, network_key, scheme, resolve_sender, on_results, rules_path=RULES_PATH, on_down=None):
+        self.count = count
+        self.network_key = network_key
+        self.scheme = scheme
+        self.resolve_sender = resolve_sender
+        self.on_results = on_results
+        self.on_down = on_down
+        self.rules_path = rules_path
+        self.ring = HashRing(range(count))
+        self.sent = [0] * count
+        self.received = [0] * count
+        self.lost = [0] * count
+        self._conns = [None] * count
+        self._locks = [threading.Lock() for _ in range(count)]
+        self._ring_lock = threading.Lock()
+        self._registry = {}
+        self._procs = []
+        self._settings = {}
+
+    def start(self, timeout=60.0):
+        ctx = multiprocessing.get_context("spawn")
+        with socket.create_server(("127.0.0.1", 0)) as server:
+            server.settimeout(timeout)
+            port = server.getsockname()[1]
+            self._procs = [
+                ctx.Process(target=shard_main, args=(i, port, self.network_key, self.scheme, self.rules_path), name=f"HubShard-{i}", daemon=True)
+                for i in range(self.count)
+            ]
+            for proc in self._procs:
+                proc.start()
+            try:
+                for _ in range(self.count):
+                    conn, _ = server.accept()
+                    conn.settimeout(None)
+                    conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                    kind, length = _MSG.unpack(_recv_exact(conn, _MSG.size))
+                    index = int(_recv_exact(conn, length))
+                    self._conns[index] = conn
+            except (OSError, ValueError):
+                self.stop()
+                raise
+
+        for index, conn in enumerate(self._conns):
+            threading.Thread(target=self._read, args=(index, conn), name=f"HubShardReader-{index}", daemon=True).start()
+        return self
+
+    def _read(self, index, conn):
+        buffer = bytearray()
+        while True:
+            try:
+                chunk = conn.recv(RECV_BYTES)
+            except OSError:
+                break
+            if not chunk:
+                break
+            buffer += chunk
+            for kind, body in _split(buffer):
+                if kind == RESULTS:
+                    results = json.loads(body)
+                    self.received[index] += len(results)
+                    self.on_results([row for rows in results for row in rows])
+        # A closed socket means the shard is gone; stop() clears the slot
+        # first, so a clean shutdown is not reported.
+        self._down(index)
+
+    def _send(self, index, messages):
+        conn = self._conns[index]
+        if conn is None:
+            return False
+        try:
+            with self._locks[index]:
+                conn.sendall(b"".join(messages))
+        except OSError:
+            self._down(index)
+            return False
+        return True
+
+    def _down(self, index):
+        with self._ring_lock:
+            conn = self._conns[index]
+            if conn is None:
+                return
+            self._conns[index] = None
+            self.lost[index] = max(0, self.sent[index] - self.received[index])
+            live = self.live()
+            moved = [
+                (sender_id, kind, body)
+                for sender_id, records in self._registry.items() if self.ring.node_for(sender_id) == index
+                for kind, body in records.items()
+            ]
+            self.ring = HashRing(live) if live else None
+        try:
+            conn.close()
+        except OSError:
+            pass
+        if self.on_down is not None:
+            self.on_down(index, self.lost[index])
+        self.dispatch(moved)
+
+    def live(self):
+        return [index for index, conn in enumerate(self._conns) if conn is not None]
+
+    def _broadcast(self, kind, body):
+        for index in self.live():
+            self._send(index, [_message(kind, body)])
+
+    def configure(self, **settings):
+        if settings.items() <= self._settings.items():
+            return
+        self._settings.update(settings)
+        self._broadcast(CONFIG, json.dumps(self._settings).encode("utf-8"))
+
+    def sender_of(self, item):
+        # Binary frames are routed on their header alone.
+        if isinstance(item, (bytes, bytearray, memoryview)):
+            try:
+                return self.resolve_sender(peek_sender_index(item))
+            except FrameError:
+                return "UNKNOWN"
+        return item.sender_id
+
+    def dispatch(self, messages):
+        # messages: (sender_id, kind, body); each goes to the sender's shard.
+        # A batch whose shard fails is re-routed once the ring has dropped
+        # that shard. Returns the messages no live shard could take.
+        while messages:
+            outgoing = {}
+            with self._ring_lock:
+                ring = self.ring
+                for message in messages:
+                    sender_id, kind, body = message
+                    if kind in (PEER, SESSION):
+                        self._registry.setdefault(sender_id, {})[kind] = body
+                    if ring is not None:
+                        outgoing.setdefault(ring.node_for(sender_id), []).append(message)
+            if ring is None:
+                return messages
+            messages = []
+            for index, batch in outgoing.items():
+                if self._send(index, [_message(kind, body) for _, kind, body in batch]):
+                    self.sent[index] += sum(kind in (FRAME, PACKET) for _, kind, _ in batch)
+                else:
+                    messages += batch
+        return []
+
+    def submit(self, items):
+        # Returns the items no live shard could take, for local verification.
+        messages = [(self.sender_of(item), *packet_message(item)) for item in items]
+        undelivered = set(map(id, self.dispatch(messages)))
+        return [item for item, message in zip(items, messages) if id(message) in undelivered]
+
+    def register_peers(self, peers):
+        # peers: (peer_id, fleet slot, public key). Only the owning shard needs them.
+        self.dispatch([(peer_id, *peer_message(peer_id, slot, key)) for peer_id, slot, key in peers])
+
+    def register_session(self, session):
+        self.dispatch([(session.peer, *session_message(session))])
+
+    def pending(self):
+        return sum(self.sent) - sum(self.received) - sum(self.lost)
+
+    def stats(self):
+        return [
+            {
+                "shard": index,
+                "pid": proc.pid,
+                "alive": proc.is_alive() and self._conns[index] is not None,
+                "sent": self.sent[index],
+                "results": self.received[index],
+                "lost": self.lost[index],
+            }
+            for index, proc in enumerate(self._procs)
+        ]
+
+    def stop(self, timeout=2.0):
+        for index, conn in enumerate(self._conns):
+            if conn is None:
+                continue
+            self._conns[index] = None
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            conn.close()
+        for proc in self._procs:
+            proc.join(timeout)
+            if proc.is_alive():
+                proc.terminate()
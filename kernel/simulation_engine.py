@@ -1,125 +1,261 @@
 import threading
 import time
 import random
-import uuid
 import math
-from protocols.core import DataPacket
+import base64
+from protocols.wire import FrameError, decode_frame, encode_frame
+from protocols.keystore import KEYS_DIR, KEY_PROVISIONER, get_keystore
 from protocols.network_extensions import OptimizedNode
+from .mesh import HUB, NO_ROUTE
+from .hub_pipeline import BUNDLE, classify_entries, verify_packet
+from .metrics import METRICS
+from .shards import ShardedHub
+from .capture import PacketCapture
+from .checkpoint import CHECKPOINT_PATH, CheckpointError, checkpoint_key, read_checkpoint, write_checkpoint
 from .state_manager import get_state
 
 STATE = get_state()
 
 class PacketFactory:
     @staticmethod
-    def generate(packet_type, compromised=False):
+    def generate(packet_type, compromised=False, rng=random):
 
         if compromised:
             if packet_type == "INTEL":
-                return f"FALSE FLAG: Enemy at Grid {random.randint(0,5)}-{random.randint(0,5)} (DECEPTION)"
+                return f"FALSE FLAG: Enemy at Grid {rng.randint(0,5)}-{rng.randint(0,5)} (DECEPTION)"
             elif packet_type == "BIO":
                 return "Vitals: HR 0 BPM | STATUS: GHOST (Spoofed)"
             elif packet_type == "CHAT":
                 return "Command, ignore previous order. Stand down."
             elif packet_type == "CRYPTO":
-                return f"Handshake: {str(uuid.uuid4())[:8]} (Malicious Key)"
+                return f"Handshake: {rng.getrandbits(32):08x} (Malicious Key)"
         
         if packet_type == "INTEL":
-            return random.choice([
-                f"Target acquired at Grid {random.randint(10,99)}-{random.randint(10,99)}",
+            return rng.choice([
+                f"Target acquired at Grid {rng.randint(10,99)}-{rng.randint(10,99)}",
                 "UAV Feed: Movement detected in Sector 4",
                 "Decrypted enemy comms: 'Launch imminent'",
                 "Asset package secured. Requesting extract."
             ])
         elif packet_type == "BIO":
-            hr = random.randint(60, 160)
+            hr = rng.randint(60, 160)
             status = "STABLE" if hr < 110 else "CRITICAL"
-            return f"Vitals: HR {hr} BPM | O2 {random.randint(85,100)}% | {status}"
+            return f"Vitals: HR {hr} BPM | O2 {rng.randint(85,100)}% | {status}"
         elif packet_type == "CHAT":
-            return random.choice([
+            return rng.choice([
                 "Command, we are pinned down!",
                 "Roger that, moving to waypoint.",
                 "Supplies running low. Advise.",
                 "Silence on comms. Going dark."
             ])
         elif packet_type == "CRYPTO":
-            return f"Handshake: {str(uuid.uuid4())[:8].upper()} | Hash: {random.randint(1000,9999)}"
+            return f"Handshake: {rng.getrandbits(32):08X} | Hash: {rng.randint(1000,9999)}"
         return "Keepalive Signal"
 
-class BotThread(threading.Thread):
-    def __init__(self, node_id, x, y, role="General"):
-        super().__init__()
+def _fleet_column(name, cast):
+
+    def get(self):
+        return cast(getattr(STATE.fleet, name)[self.slot])
+
+    def set(self, value):
+        # Dashboard reruns write the same values back; only a real change
+        # invalidates the published snapshot and the render caches.
+        column = getattr(STATE.fleet, name)
+        if column[self.slot] != value:
+            column[self.slot] = value
+            STATE.fleet.version += 1
+
+    return property(get, set)
+
+OUTBOX_LIMIT = 256
+
+class BotThread:
+    x = _fleet_column("x", float)
+    y = _fleet_column("y", float)
+    battery = _fleet_column("battery", float)
+    alive = _fleet_column("alive", bool)
+    is_sending = _fleet_column("sending", bool)
+    is_compromised = _fleet_column("compromised", bool)
+
+    def __init__(self, node_id, x, y, role="General", slot=None, scheme=None):
         self.node_id = node_id
-        self.node_logic = OptimizedNode(node_id, STATE.network_key)
-        self.x = x
-        self.y = y
+        self.node_logic = OptimizedNode(node_id, STATE.network_key, scheme or STATE.signature_scheme)
+        self.node_logic.clock = STATE.clock.time
+        # A slot is passed in when the fleet store was bulk-loaded from a checkpoint.
+        self.slot = STATE.fleet.add(node_id, x, y) if slot is None else slot
         self.role = role
-        self.alive = True
-        self.battery = 100.0
-        self.is_sending = False 
-        self.is_compromised = False
-        self.daemon = True 
+        self.outbox = []
+        self.outbox_started = 0.0
+        self.flushing = False
+        self.timer_armed = False
+
+    def start(self):
+        STATE.scheduler.schedule(self.run())
 
     def run(self):
         while True:
             
             if not STATE.is_running:
-                time.sleep(1)
+                yield 1.0
                 continue
             
-            with STATE.lock:
-                if self.node_id not in STATE.nodes:
-                    break
+            if self.node_id not in STATE.nodes:
+                return
 
             if not self.alive:
-                if STATE.auto_revive and random.random() < 0.05:
-                    self.alive = True
-                    self.battery = 40.0
-                else:
-                    time.sleep(1)
-                    continue
+                yield 1.0
+                continue
 
-            base_delay = random.uniform(0.5, 2.5) / STATE.speed_mod
-            total_delay = base_delay + random.uniform(0, STATE.jitter)
-            time.sleep(max(0.1, total_delay))
+            base_delay = STATE.rng.uniform(0.5, 2.5) / STATE.speed_mod
+            total_delay = base_delay + STATE.rng.uniform(0, STATE.jitter)
+            yield max(0.1, total_delay)
 
-            drain = random.uniform(0.5, 1.5) * STATE.batt_drain_mod
-            self.battery -= drain
-            if self.battery <= 0:
-                self.alive = False
+            # Drain, death and revival are applied fleet-wide by fleet_physics.
+            if not self.alive or self.battery <= 0:
                 continue
+            STATE.fleet.tx_count[self.slot] += 1
 
             try:
-                distance_to_hub = math.sqrt(self.x**2 + self.y**2)
-
-                if distance_to_hub > STATE.max_range:
+                next_hop = STATE.fleet.next_hop[self.slot]
+                if next_hop == NO_ROUTE:
                     continue 
 
-                p_type = random.choice(STATE.packet_types)
-                is_malicious = self.is_compromised or (random.random() < STATE.hack_prob)
-                content = PacketFactory.generate(p_type, is_malicious)
+                # Every relay on the way to the hub pays for forwarding the packet.
+                while next_hop != HUB:
+                    STATE.fleet.tx_count[next_hop] += 1
+                    next_hop = STATE.fleet.next_hop[next_hop]
 
-                payload_data = {"type": p_type, "content": content}
-                encrypted = self.node_logic.vault.encrypt_payload(payload_data)
+                p_type = STATE.rng.choice(STATE.packet_types)
+                is_malicious = self.is_compromised or (STATE.rng.random() < STATE.hack_prob)
+                started = METRICS.start()
+                content = PacketFactory.generate(p_type, is_malicious, STATE.rng)
+                METRICS.observe("generate", started)
+                forged = is_malicious and STATE.rng.random() < 0.3
 
-                if is_malicious and random.random() < 0.3:
-                    sig = "INVALID_SIG_BLOCK"
-                else:
-                    sig = self.node_logic.vault.sign_message(encrypted)
+                priority = STATE.packet_priorities.get(p_type, len(STATE.packet_priorities))
+                self.stash({"type": p_type, "content": content}, priority, forged)
+            except Exception as e:
+                continue
+
+            if len(self.outbox) >= STATE.bundle_size or STATE.clock.time() - self.outbox_started >= STATE.bundle_window:
+                yield from self.flush()
+
+    def stash(self, entry, priority, forged):
+        if not self.outbox:
+            self.outbox_started = STATE.clock.time()
+        self.outbox.append((entry, priority, forged))
+        # A unit that cannot get anything out keeps only its newest payloads.
+        del self.outbox[:-OUTBOX_LIMIT]
+        if STATE.bundle_size > 1 and not self.timer_armed:
+            self.timer_armed = True
+            STATE.scheduler.schedule(self.flush_timer(), STATE.bundle_window)
+
+    def bundle(self):
+        # (payload, priority, forged) for the whole outbox. A bundle goes
+        # out at its most urgent entry's priority, and one tampered entry
+        # spoils the signature for all of them.
+        if len(self.outbox) == 1:
+            return self.outbox[0]
+        entries, priorities, forgeries = zip(*self.outbox)
+        return {"type": BUNDLE, "entries": list(entries)}, min(priorities), any(forgeries)
 
+    def flush(self):
+        # Entries leave the outbox only once the queue has taken the packet
+        # (or dropped it on overflow, which is loss on the air); a failed
+        # handshake or an error keeps them for the next attempt.
+        if self.flushing or not self.outbox:
+            return
+        self.flushing = True
+        try:
+            payload_data, priority, forged = self.bundle()
+            count = len(self.outbox)
+            started = METRICS.start()
+            encrypted = self.node_logic.vault.encrypt_payload_bytes(payload_data)
+            METRICS.observe("encrypt", started)
+
+            session = None
+            if STATE.auth_mode == "session":
+                session = self.session()
+                if session is None:
+                    return
+
+            started = METRICS.start()
+            if forged:
+                # Tail of the token keeps forgeries distinct, so the replay guard passes them to the signature check.
+                sig = b"INVALID_SIG_BLOCK" + encrypted[-16:]
+            elif session:
+                sig = session.sign_bytes(encrypted)
+            else:
+                sig = self.node_logic.vault.sign_bytes(encrypted)
+            METRICS.observe("sign", started)
+
+            session_id = session.session_id if session else ""
+            if STATE.wire_format == "binary":
+                packet = encode_frame(self.slot, STATE.clock.time(), encrypted, sig, session_id)
+            else:
+                from protocols.packet import DataPacket
                 packet = DataPacket(
                     sender_id=self.node_id, 
-                    timestamp=str(time.time()), 
-                    encrypted_payload=encrypted, 
-                    signature=sig
+                    timestamp=str(STATE.clock.time()), 
+                    encrypted_payload=encrypted.decode('utf-8'), 
+                    signature=base64.b64encode(sig).decode('utf-8'),
+                    session_id=session_id
                 )
 
-                self.is_sending = True
-                STATE.packet_queue.put(packet)
-                time.sleep(0.3) 
-                self.is_sending = False
+            self.is_sending = True
+            # Under the "block" policy a full queue pushes back on the sender.
+            while not STATE.packet_queue.put(packet, priority) and STATE.packet_queue.policy == "block":
+                yield 0.1
+            # Payloads stashed while blocked stay for the next bundle.
+            del self.outbox[:count]
+            self.outbox_started = STATE.clock.time()
+        except Exception as e:
+            return
+        finally:
+            self.flushing = False
 
-            except Exception as e:
-                pass
+        yield 0.3
+        self.is_sending = False
+
+    def flush_timer(self):
+        # Sends a partial bundle once its window closes, even when no new
+        # payload comes along to trigger it. Dead or cut-off units hold on
+        # to theirs until they can transmit again.
+        try:
+            while self.outbox and self.node_id in STATE.nodes:
+                wait = self.outbox_started + STATE.bundle_window - STATE.clock.time()
+                if wait > 0:
+                    yield wait
+                elif STATE.is_running and self.alive and self.battery > 0 and STATE.fleet.next_hop[self.slot] != NO_ROUTE:
+                    yield from self.flush()
+                    if self.outbox:
+                        yield 1.0
+                else:
+                    yield 1.0
+        finally:
+            self.timer_armed = False
+
+    def session(self):
+        hub_name = STATE.hub_node.name
+        session = self.node_logic.sessions.get(hub_name)
+        if session is not None and not session.needs_rotation(STATE.clock.time()):
+            return session
+
+        if hub_name not in self.node_logic.known_peers:
+            self.node_logic.known_peers[hub_name] = STATE.hub_node.vault.get_public_key_str()
+
+        hello = self.node_logic.begin_handshake(hub_name)
+        reply = hub_handshake(hello)
+        fresh = self.node_logic.complete_handshake(
+            hub_name, reply, self.node_logic.known_peers[hub_name],
+            rotate_after=STATE.session_rotate_after
+        )
+        if fresh is not None:
+            return fresh
+        # A failed rotation keeps using the old key until the hub expires it.
+        if session is not None and not session.expired(STATE.clock.time()):
+            return session
+        return None
 
 class HubListener(threading.Thread):
     def __init__(self):
@@ -129,56 +265,305 @@ class HubListener(threading.Thread):
     def run(self):
         while True:
             try:
-                packet = STATE.packet_queue.get(timeout=0.5)
-                time.sleep(random.uniform(0.05, 0.2))
-                self.process(packet)
+                shards = STATE.shards
+                if shards is not None:
+                    # Sharded mode: the hub processes verify; results come back through STATE.log.
+                    # Whatever no live shard could take is verified here instead.
+                    shards.configure(strict_replay=STATE.strict_replay)
+                    leftover = shards.submit([item for item in STATE.packet_queue.drain(STATE.hub_batch_size, 0.5) if admit_sender(shards.sender_of(item))])
+                    batch = [packet for packet in map(self.receive, leftover) if packet is not None]
+                else:
+                    batch = self.next_batch()
+                if not batch:
+                    continue
+                STATE.hub_pool.resize(STATE.hub_workers)
+                verdicts = STATE.hub_pool.map(self.transit, batch)
+                for packet, verdict in zip(batch, verdicts):
+                    self.process(packet, verdict)
             except:
                 pass
 
-    def process(self, packet):
-        if STATE.strict_replay:
-            if not STATE.hub_node.is_timestamp_valid(packet.timestamp):
-                STATE.log("SEC", "Timestamp Expired", "REJECTED", packet.sender_id)
-                return
+    def next_batch(self, timeout=0.5):
+        # Shed packets cost nothing downstream, so keep draining until a full
+        # batch is admitted or the queue runs dry; otherwise a flood would
+        # still crowd the queue while each batch waits on verification.
+        admitted = []
+        batch = STATE.packet_queue.drain(STATE.hub_batch_size, timeout)
+        while batch:
+            admitted += [packet for packet in map(self.receive, batch) if packet is not None and admit_sender(packet.sender_id)]
+            if len(admitted) >= STATE.hub_batch_size:
+                break
+            batch = STATE.packet_queue.drain(STATE.hub_batch_size - len(admitted))
+        return admitted
+
+    def receive(self, item):
+        if not isinstance(item, (bytes, bytearray, memoryview)):
+            return item
+        try:
+            return decode_frame(item, STATE.fleet.id_at)
+        except FrameError:
+            STATE.log("SEC", "Malformed Frame", "REJECTED", "UNKNOWN")
+            return None
+
+    def transit(self, packet):
+        if STATE.link_latency[1] > 0:
+            time.sleep(random.uniform(*STATE.link_latency))
+        return self.verify(packet)
+
+    def verify(self, packet):
+        return verify_packet(packet, STATE.hub_node, STATE.replay_guard, resolve_peer_key, STATE.clock.time(), STATE.strict_replay)
+
+    def process(self, packet, verdict=None):
+        if verdict is None:
+            verdict = self.verify(packet)
 
+        data, rejection = verdict
+        if rejection:
+            log_verdict(*rejection, packet.sender_id)
+            return
+        for row in classify_entries(data, STATE.rules):
+            log_verdict(*row, packet.sender_id)
+
+def admit_sender(sender_id):
+    # Unknown senders skip the buckets; resolve_peer_key blocks them before any crypto anyway.
+    if sender_id not in STATE.nodes:
+        return True
+    return STATE.admission.admit(sender_id, STATE.clock.time())
+
+def log_verdict(type_, content, status, sender):
+    STATE.log(type_, content, status, sender)
+    sentence = STATE.admission.record(sender, type_, content, status, STATE.clock.time())
+    if sentence:
+        STATE.log("SEC", f"Sender Quarantined ({sentence:.0f}s)", "BLOCKED", sender)
+
+def resolve_peer_key(sender_id):
+    if sender_id not in STATE.nodes:
+        return None, ("SEC", "Unknown Signal Source", "BLOCKED")
+
+    keys = STATE.hub_node.vault.peers.get(sender_id)
+    if not keys:
+        return None, ("SEC", "No Key Found", "REJECTED")
+    return keys, None
+
+def hub_handshake(hello):
+    _, rejection = resolve_peer_key(hello["sender_id"])
+    if rejection:
+        STATE.log(*rejection, hello["sender_id"])
+        return None
+
+    reply = STATE.hub_node.accept_handshake(hello, ttl=STATE.session_ttl)
+    if reply is None:
+        STATE.log("SEC", "Handshake Refused", "CRITICAL", hello["sender_id"])
+    else:
+        session = STATE.hub_node.sessions[reply["session_id"]]
+        if STATE.shards is not None:
+            STATE.shards.register_session(session)
+        if STATE.capture is not None:
+            STATE.capture.session(session)
+    return reply
+
+def fleet_physics(interval=0.25):
+    last = STATE.clock.monotonic()
+    while True:
+        yield interval
+        now = STATE.clock.monotonic()
+        dt, last = now - last, now
+        if STATE.is_running:
+            STATE.fleet.tick(dt, STATE.max_range, STATE.batt_drain_mod, STATE.auto_revive, STATE.fleet_rng)
+        if STATE.mesh.sync(STATE.fleet, STATE.max_range, STATE.link_range):
+            STATE.active_links = STATE.mesh.links
+        STATE.publish()
+
+def log_flusher(interval=0.5):
+    while True:
+        yield interval
+        STATE.log_store.flush()
+        if STATE.capture is not None:
+            STATE.capture.flush()
+
+def deploy_units(count):
+    new_ids = [f"Unit-{i+1:02d}" for i in range(len(STATE.nodes), count)]
+    KEY_PROVISIONER.provision(get_keystore(KEYS_DIR), new_ids, STATE.signature_scheme)
+    bots = []
+
+    for nid in new_ids:
+
+        angle = STATE.rng.uniform(0, 2 * math.pi)
+        radius = STATE.rng.uniform(2, STATE.max_range * 0.8)
+        x, y = radius * math.cos(angle), radius * math.sin(angle)
+
+        bot = BotThread(nid, x, y)
         with STATE.lock:
-             
-            if packet.sender_id not in STATE.nodes:
-                STATE.log("SEC", "Unknown Signal Source", "BLOCKED", packet.sender_id)
-                return
-            
-            if packet.sender_id not in STATE.hub_node.known_peers:
-
-                target_node = STATE.nodes[packet.sender_id]
-                pub_key = target_node.node_logic.vault.get_public_key_str()
-                STATE.hub_node.known_peers[packet.sender_id] = pub_key
-
-        sender_key_pem = STATE.hub_node.known_peers.get(packet.sender_id)
-
-        if not sender_key_pem:
-            STATE.log("SEC", "No Key Found", "REJECTED", packet.sender_id)
-        elif not STATE.hub_node.vault.verify_signature(packet.encrypted_payload, packet.signature, packet.sender_id, sender_key_pem):
-            STATE.log("SEC", "Bad Signature", "CRITICAL", packet.sender_id)
-        else:
-    
-            data = STATE.hub_node.vault.decrypt_payload(packet.encrypted_payload)
-            if not data:
-                STATE.log("SEC", "Decryption Fail", "CRITICAL", packet.sender_id)
-                return
+            STATE.nodes[nid] = bot
+        bots.append(bot)
 
-            content = data.get("content", "")
-            msg_type = data.get("type", "UNKNOWN")
-            
-            if "FALSE FLAG" in content or "DECEPTION" in content:
-                
-                STATE.log("MALWARE", "Intel Fabricated", "BLOCKED", packet.sender_id)
-            elif "Spoofed" in content:
-                 STATE.log("MALWARE", "Bio-Metric Spoof", "BLOCKED", packet.sender_id)
-            else:
-                STATE.log(msg_type, content, "VERIFIED", packet.sender_id)
+    enlist(bots)
+    return new_ids
+
+def enlist(bots):
+    # Register the identities the new units actually run with, replacing any
+    # preloaded keys for the same names (e.g. from a different scheme).
+    STATE.hub_node.vault.peers.put_many({bot.node_id: (bot.node_logic.vault.public_key,) for bot in bots})
+    if STATE.shards is not None:
+        STATE.shards.register_peers(peer_records(bots))
+    if STATE.capture is not None:
+        STATE.capture.peers(peer_records(bots))
+    for bot in bots:
+        bot.start()
+    STATE.publish()
+
+def peer_records(bots):
+    return [(bot.node_id, bot.slot, bot.node_logic.vault.public_key) for bot in bots]
+
+def log_results(results):
+    for row in results:
+        log_verdict(*row)
+
+def shard_down(index, lost):
+    # The dead shard's senders are already re-homed; what it held in flight is gone.
+    STATE.log("SEC", f"Hub Shard {index} Down ({lost} pkts lost)", "CRITICAL", "CENTRAL_HUB")
+
+def start_shards(count):
+    # count == 0 goes back to the in-process verification pool.
+    with STATE.lock:
+        current = STATE.shards
+        if (current.count if current else 0) == count:
+            return current
+        STATE.shards = None
+    if current is not None:
+        current.stop()
+    if not count:
+        return None
+
+    shards = ShardedHub(count, STATE.network_key, STATE.hub_node.vault.scheme.name, STATE.fleet.id_at, log_results, on_down=shard_down).start()
+    shards.register_peers(peer_records(list(STATE.nodes.values())))
+    for session in list(STATE.hub_node.sessions.values()):
+        shards.register_session(session)
+    STATE.shards = shards
+    return shards
+
+def start_capture(path):
+    with STATE.lock:
+        if STATE.capture is None:
+            capture = PacketCapture(path, STATE.network_key, STATE.hub_node.vault.scheme.name, STATE.clock.time)
+            capture.peers(peer_records(list(STATE.nodes.values())))
+            for session in list(STATE.hub_node.sessions.values()):
+                capture.session(session)
+            STATE.capture = capture
+            STATE.packet_queue.tap = capture.packet
+        return STATE.capture
+
+def stop_capture():
+    with STATE.lock:
+        capture, STATE.capture = STATE.capture, None
+        STATE.packet_queue.tap = None
+    if capture is not None:
+        capture.close()
+    return capture
+
+CHECKPOINT_SETTINGS = (
+    "speed_mod", "hack_prob", "jitter", "packet_types", "auto_revive",
+    "max_range", "link_range", "batt_drain_mod", "strict_replay",
+    "auth_mode", "wire_format", "session_ttl", "session_rotate_after",
+    "bundle_size", "bundle_window",
+    "hub_workers", "hub_batch_size", "signature_scheme",
+)
+
+def save_checkpoint(path=CHECKPOINT_PATH):
+    with STATE.lock:
+        columns = STATE.fleet.columns()
+        ids = STATE.fleet.ids[:len(columns["x"])]
+        bots = [STATE.nodes[nid] for nid in ids]
+    meta = {
+        "saved_at": STATE.clock.time(),
+        "network_key": STATE.network_key.decode("ascii"),
+        "settings": {name: getattr(STATE, name) for name in CHECKPOINT_SETTINGS},
+        "roles": [bot.role for bot in bots],
+        "logs": STATE.logs.recent(),
+        "status_counts": dict(STATE.status_counts),
+    }
+    identities = [(bot.node_logic.vault.scheme.name, *bot.node_logic.vault.export_keys()) for bot in bots]
+    write_checkpoint(path, meta, ids, columns, identities, checkpoint_key(KEYS_DIR))
+    return len(ids)
+
+def restore_checkpoint(path=CHECKPOINT_PATH):
+    # One bulk pass: missing key pairs go into the keystore in a single
+    # append, the fleet store is loaded column by column and the units
+    # start without provisioning anything. The checkpoint's HMAC shows this
+    # deployment wrote it, so its keys are trusted like ones it generated
+    # and skip the per-key RSA check.
+    meta, ids, columns, identities = read_checkpoint(path, checkpoint_key(KEYS_DIR))
+    if STATE.capture is not None:
+        raise CheckpointError("stop the traffic capture before restoring")
+    if STATE.nodes:
+        raise CheckpointError("restore needs an empty fleet")
+    shard_count = STATE.shards.count if STATE.shards else 0
+    if shard_count:
+        # Shards hold the old network key.
+        start_shards(0)
+
+    with STATE.lock:
+        if STATE.nodes:
+            raise CheckpointError("restore needs an empty fleet")
+        for name, value in meta["settings"].items():
+            if name in CHECKPOINT_SETTINGS:
+                setattr(STATE, name, value)
+        STATE.use_network_key(meta["network_key"].encode("ascii"))
+
+        store = get_keystore(KEYS_DIR)
+        store.put_many([
+            (nid, scheme, priv_der, pub_der)
+            for nid, (scheme, priv_der, pub_der) in zip(ids, identities)
+            if store.get(nid, scheme) != (priv_der, pub_der)
+        ], trusted=True)
+        store.trust((nid, scheme) for nid, (scheme, _, _) in zip(ids, identities))
+        STATE.fleet.load(ids, columns)
+        bots = [
+            BotThread(nid, columns["x"][slot], columns["y"][slot], role, slot=slot, scheme=scheme)
+            for slot, (nid, role, (scheme, _, _)) in enumerate(zip(ids, meta["roles"], identities))
+        ]
+        STATE.nodes.update((bot.node_id, bot) for bot in bots)
+        STATE.logs.restore(meta["logs"], meta["status_counts"])
+
+    enlist(bots)
+    if shard_count:
+        start_shards(shard_count)
+    return len(bots)
+
+def start_fleet_scheduler():
+
+    with STATE.lock:
+        if not STATE.scheduler.is_alive():
+            STATE.scheduler.start()
+            STATE.scheduler.schedule(fleet_physics())
+            STATE.scheduler.schedule(log_flusher())
+
+def metrics_counters():
+    return {
+        "catenate_log_entries_total": ("Log entries by status.", {f'status="{s}"': c for s, c in STATE.status_counts.items()}),
+        "catenate_queue_dropped_total": ("Packets dropped by the hub queue, by priority.", {f'priority="{p}"': c for p, c in STATE.packet_queue.dropped.items()}),
+        "catenate_replay_duplicates_total": ("Replayed packets rejected at the hub.", {"": STATE.replay_guard.duplicates}),
+        "catenate_admission_shed_total": ("Packets shed by hub admission control, by reason.", {f'reason="{r}"': c for r, c in STATE.admission.totals().items() if r != "admitted"}),
+    }
+
+def preload_peer_keys():
+    # One bulk pass over keys/ at hub start; later lookups are dict hits.
+    with STATE.lock:
+        if not STATE.peers_preloaded:
+            STATE.hub_node.preload_peers()
+            STATE.peers_preloaded = True
+
+def start_metrics_server():
+    try:
+        return METRICS.serve(metrics_counters)
+    except OSError:
+        # Port taken, most likely by another dashboard process already exporting.
+        return None
 
 def start_hub_listener():
 
+    preload_peer_keys()
+
     if not any(t.name == "HubListener" for t in threading.enumerate()):
         h = HubListener()
         h.name = "HubListener"
@@ -1,9 +1,26 @@
-import streamlit as st
 import threading
-from collections import deque
+import random
+import numpy as np
+import itertools
+from collections import namedtuple
 from datetime import datetime
 from cryptography.fernet import Fernet
+from protocols.core import DEFAULT_SIGNATURE_SCHEME
 from protocols.network_extensions import OptimizedNode
+from protocols.replay import ReplayGuard
+from .clock import WALL_CLOCK
+from .scheduler import FleetScheduler
+from .fleet_store import FleetStore
+from .mesh import MeshRouter
+from .hub_pipeline import VerificationPool
+from .packet_queue import PriorityPacketQueue
+from .log_ring import LogRing
+from .log_store import LogStore
+from .metrics import METRICS
+from .rules import RuleEngine
+from .admission import AdmissionControl
+
+Snapshot = namedtuple("Snapshot", "epoch fleet links logs fleet_version log_version")
 
 class SimulationState:
     def __init__(self):
@@ -12,18 +29,29 @@ class SimulationState:
 
         self.network_key = Fernet.generate_key()
         
-        self.packet_queue = None 
-        import queue
-        self.packet_queue = queue.Queue()
+        self.packet_priorities = {"BIO": 0, "INTEL": 1, "CRYPTO": 2, "CHAT": 3}
+        self.packet_queue = PriorityPacketQueue(capacity=2048, policy="drop-lowest")
         
         self.nodes = {}       
+
+        self.clock = WALL_CLOCK
+        self.rng = random.Random()
+        self.fleet = FleetStore()
+        self.fleet_rng = np.random.default_rng()
+        self.scheduler = FleetScheduler(self.clock)
         
-        self.logs = deque(maxlen=50)
+        self.logs = LogRing(capacity=50)
+        self.log_store = LogStore()
         
         self.active_links = [] 
+        self._epoch = itertools.count()
+        self.snapshot = None
+        self.publish()
         self.is_running = False
 
-        self.hub_node = OptimizedNode("CENTRAL_HUB", self.network_key)
+        self.signature_scheme = DEFAULT_SIGNATURE_SCHEME
+        self.peers_preloaded = False
+        self.hub_node = OptimizedNode("CENTRAL_HUB", self.network_key, self.signature_scheme, peer_loader=self.peer_keys)
 
         self.speed_mod = 1.0
         self.hack_prob = 0.0
@@ -32,21 +60,96 @@ class SimulationState:
         self.auto_revive = False
 
         self.max_range = 15.0       
+        self.link_range = 6.0
+        self.mesh = MeshRouter()
         self.batt_drain_mod = 1.0   
         self.strict_replay = True   
+        self.replay_guard = ReplayGuard()
+        self.rules = RuleEngine()
+
+        self.auth_mode = "signature"
+        self.wire_format = "binary"
+        self.session_ttl = 300.0
+        self.session_rotate_after = 240.0
+        # Units hold payloads until bundle_size are waiting or the oldest is
+        # bundle_window seconds old, then sign and send them as one packet.
+        self.bundle_size = 1
+        self.bundle_window = 2.0
+
+        # Simulated bot-to-hub link delay in seconds, paid per packet by a hub worker.
+        self.link_latency = (0.05, 0.2)
+        self.hub_workers = 2
+        self.hub_batch_size = 16
+        self.hub_pool = VerificationPool(self.hub_workers)
+        self.admission = AdmissionControl()
+        self.shards = None
+        self.capture = None
+
+    def seed(self, seed):
+        self.rng.seed(seed)
+        self.fleet_rng = np.random.default_rng(seed)
+
+    def peer_keys(self, node_id):
+        # The hub trusts whatever identity the deployed unit is running with.
+        node = self.nodes.get(node_id)
+        return (node.node_logic.vault.public_key,) if node is not None else None
+
+    def use_network_key(self, network_key):
+        # Units deployed afterwards pick the key up from here; the hub needs a fresh vault.
+        self.network_key = network_key
+        self.hub_node = OptimizedNode("CENTRAL_HUB", network_key, self.signature_scheme, peer_loader=self.peer_keys)
+        self.hub_node.clock = self.clock.time
+        self.peers_preloaded = False
+
+    def use_clock(self, clock):
+        self.clock = clock
+        self.scheduler.clock = clock
+        self.hub_node.clock = clock.time
 
     def log(self, type_, content, status, sender):
         
+        started = METRICS.start()
+        now = self.clock.time()
         entry = {
-            "Time": datetime.now().strftime("%H:%M:%S"),
+            "Time": datetime.fromtimestamp(now).strftime("%H:%M:%S"),
             "ID": sender,
             "Type": type_,
             "Payload": content,
             "Status": status
         }
-        with self.lock:
-            self.logs.appendleft(entry)
+        self.logs.append(entry)
+        self.log_store.append(now, sender, type_, content, status)
+        METRICS.observe("log", started)
+
+    @property
+    def status_counts(self):
+        return self.logs.counts()
+
+    def publish(self):
+        # Readers grab STATE.snapshot once and never see a half-updated view;
+        # swapping the reference is atomic, so nobody waits on anybody.
+        fleet_version, log_version = self.fleet.version, self.logs.version
+        current = self.snapshot
+        if current and current.fleet_version == fleet_version and current.log_version == log_version and current.links is self.active_links:
+            return current
+        self.snapshot = Snapshot(
+            next(self._epoch),
+            self.fleet.snapshot() if not current or current.fleet_version != fleet_version else current.fleet,
+            self.active_links,
+            tuple(self.logs.recent()) if not current or current.log_version != log_version else current.logs,
+            fleet_version,
+            log_version
+        )
+        return self.snapshot
+
+# One simulation per process, shared by every dashboard session and rerun.
+_STATE = None
+_STATE_LOCK = threading.Lock()
 
-@st.cache_resource
 def get_state():
-    return SimulationState()
\ No newline at end of file
+    global _STATE
+    if _STATE is None:
+        with _STATE_LOCK:
+            if _STATE is None:
+                _STATE = SimulationState()
+    return _STATE
\ No newline at end of file
@@ -2,37 +2,117 @@ import json
 import base64
 import os
 import time
+import threading
+from abc import ABC, abstractmethod
 from datetime import datetime
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from cryptography.hazmat.primitives.asymmetric import padding, rsa, ed25519
 from cryptography.hazmat.primitives import serialization
-from pydantic import BaseModel
+from .keystore import KEYS_DIR, KEY_PROVISIONER, get_keystore
+from .peer_directory import PeerKeyDirectory
+from .session import SessionKey, SESSION_TTL, SESSION_ROTATE_AFTER, new_ephemeral, new_session_id, derive_session_key
 
-class DataPacket(BaseModel):
-    sender_id: str
-    timestamp: str 
-    encrypted_payload: str
-    signature: str
-    
-    def to_json(self):
-        return self.model_dump_json()
+def __getattr__(name):
+    # DataPacket drags in pydantic; binary-wire deployments never touch it.
+    if name == "DataPacket":
+        from .packet import DataPacket
+        return DataPacket
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class SignatureScheme(ABC):
+    name = None
+    key_suffix = ""
+
+    @abstractmethod
+    def generate(self):
+        ...
+
+    @abstractmethod
+    def sign(self, private_key, data: bytes) -> bytes:
+        ...
+
+    @abstractmethod
+    def verify(self, public_key, signature: bytes, data: bytes):
+        ...
+
+    @abstractmethod
+    def owns(self, key) -> bool:
+        ...
+
+class RSAPSSScheme(SignatureScheme):
+    name = "rsa-pss"
+
+    def __init__(self):
+        self._padding = padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH)
+
+    def generate(self):
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def sign(self, private_key, data: bytes) -> bytes:
+        return private_key.sign(data, self._padding, hashes.SHA256())
+
+    def verify(self, public_key, signature: bytes, data: bytes):
+        public_key.verify(signature, data, self._padding, hashes.SHA256())
+
+    def owns(self, key) -> bool:
+        return isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey))
+
+class Ed25519Scheme(SignatureScheme):
+    name = "ed25519"
+    key_suffix = "_ed25519"
+
+    def generate(self):
+        return ed25519.Ed25519PrivateKey.generate()
+
+    def sign(self, private_key, data: bytes) -> bytes:
+        return private_key.sign(data)
+
+    def verify(self, public_key, signature: bytes, data: bytes):
+        public_key.verify(signature, data)
+
+    def owns(self, key) -> bool:
+        return isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey))
+
+SIGNATURE_SCHEMES = {scheme.name: scheme for scheme in (RSAPSSScheme(), Ed25519Scheme())}
+DEFAULT_SIGNATURE_SCHEME = os.environ.get("CATENATE_SIGNATURE_SCHEME", "rsa-pss")
+
+def scheme_for_key(key):
+    for scheme in SIGNATURE_SCHEMES.values():
+        if scheme.owns(key):
+            return scheme
+    return None
 
 class CryptoVault:
-    def __init__(self, node_name: str, network_key: bytes):
+    def __init__(self, node_name: str, network_key: bytes, scheme: str = None):
         self.node_name = node_name
         self.network_key = network_key
+        self.scheme = SIGNATURE_SCHEMES[scheme or DEFAULT_SIGNATURE_SCHEME]
         self.cipher = Fernet(self.network_key)
-        self.keys_dir = "keys"
+        self.keys_dir = KEYS_DIR
         
-        self._peer_key_cache = {} 
+        self.peers = PeerKeyDirectory()
         
         os.makedirs(self.keys_dir, exist_ok=True)
         self._private_key, self.public_key = self._load_or_generate_keys()
 
     def _load_or_generate_keys(self):
-        priv_path = f"{self.keys_dir}/{self.node_name}_private.pem"
-        pub_path = f"{self.keys_dir}/{self.node_name}_public.pem"
+        store = get_keystore(self.keys_dir)
+        record = store.get(self.node_name, self.scheme.name)
+        if record:
+            try:
+                # Only keys this process generated or already checked may skip the slow
+                # RSA consistency check; anything else read from disk is validated here.
+                priv = serialization.load_der_private_key(record[0], password=None, unsafe_skip_rsa_key_validation=store.trusted(self.node_name, self.scheme.name))
+                pub = serialization.load_der_public_key(record[1])
+                if self.scheme.owns(priv) and self.scheme.owns(pub):
+                    return priv, pub
+            except Exception:
+                pass
+
+        suffix = self.scheme.key_suffix
+        priv_path = f"{self.keys_dir}/{self.node_name}{suffix}_private.pem"
+        pub_path = f"{self.keys_dir}/{self.node_name}{suffix}_public.pem"
 
         if os.path.exists(priv_path) and os.path.exists(pub_path):
             try:
@@ -40,25 +120,26 @@ class CryptoVault:
                     priv = serialization.load_pem_private_key(f.read(), password=None)
                 with open(pub_path, "rb") as f:
                     pub = serialization.load_pem_public_key(f.read())
-                return priv, pub
+                if self.scheme.owns(priv) and self.scheme.owns(pub):
+                    return priv, pub
             except Exception:
                 pass 
 
-        priv = rsa.generate_private_key(public_exponent=65537, key_size=2048)
-        pub = priv.public_key()
-        
-        with open(priv_path, "wb") as f:
-            f.write(priv.private_bytes(
-                encoding=serialization.Encoding.PEM,
-                format=serialization.PrivateFormat.PKCS8,
-                encryption_algorithm=serialization.NoEncryption()
-            ))
-        with open(pub_path, "wb") as f:
-            f.write(pub.public_bytes(
-                encoding=serialization.Encoding.PEM,
-                format=serialization.PublicFormat.SubjectPublicKeyInfo
-            ))
-        return priv, pub
+        priv_der, pub_der = KEY_PROVISIONER.take(self.scheme.name)
+        store.put(self.node_name, self.scheme.name, priv_der, pub_der, trusted=True)
+        return serialization.load_der_private_key(priv_der, password=None, unsafe_skip_rsa_key_validation=True), serialization.load_der_public_key(pub_der)
+
+    def export_keys(self) -> tuple:
+        priv_der = self._private_key.private_bytes(
+            encoding=serialization.Encoding.DER,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        )
+        pub_der = self.public_key.public_bytes(
+            encoding=serialization.Encoding.DER,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        return priv_der, pub_der
 
     def get_public_key_str(self) -> str:
         pem = self.public_key.public_bytes(
@@ -68,64 +149,152 @@ class CryptoVault:
         return pem.decode('utf-8')
 
     def encrypt_payload(self, raw_data: dict) -> str:
+        return self.encrypt_payload_bytes(raw_data).decode('utf-8')
+
+    def encrypt_payload_bytes(self, raw_data: dict) -> bytes:
         json_str = json.dumps(raw_data)
-        return self.cipher.encrypt(json_str.encode('utf-8')).decode('utf-8')
+        return self.cipher.encrypt(json_str.encode('utf-8'))
 
-    def decrypt_payload(self, encrypted_str: str) -> dict:
+    def decrypt_payload(self, encrypted) -> dict:
         try:
-            return json.loads(self.cipher.decrypt(encrypted_str.encode('utf-8')).decode('utf-8'))
+            if isinstance(encrypted, str):
+                encrypted = encrypted.encode('utf-8')
+            return json.loads(self.cipher.decrypt(encrypted).decode('utf-8'))
         except Exception:
             return None
 
     def sign_message(self, message_str: str) -> str:
-        signature = self._private_key.sign(
-            message_str.encode('utf-8'),
-            padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH),
-            hashes.SHA256()
-        )
+        signature = self.sign_bytes(message_str.encode('utf-8'))
         return base64.b64encode(signature).decode('utf-8')
 
-    def get_peer_public_key(self, sender_id: str, sender_pub_pem: str):
+    def sign_bytes(self, message: bytes) -> bytes:
+        return self.scheme.sign(self._private_key, message)
+
+    def get_peer_public_keys(self, sender_id: str, sender_pub_pem: str = None) -> tuple:
+        keys = self.peers.get(sender_id)
+        if keys or not sender_pub_pem:
+            return keys
 
-        if sender_id in self._peer_key_cache:
-            return self._peer_key_cache[sender_id]
-        
         try:
             pub_key = serialization.load_pem_public_key(sender_pub_pem.encode('utf-8'))
-            self._peer_key_cache[sender_id] = pub_key
-            return pub_key
         except Exception:
-            return None
+            return ()
+        self.peers.put(sender_id, (pub_key,))
+        return (pub_key,)
 
-    def verify_signature(self, message_str: str, signature_str: str, sender_id: str, sender_public_key_pem: str) -> bool:
+    def verify_signature(self, message, signature, sender_id: str, sender_public_key_pem: str = None) -> bool:
+        # str arguments are the JSON form (text message, base64 signature);
+        # bytes-like arguments come raw off the binary wire.
         try:
-            sender_pub_key = self.get_peer_public_key(sender_id, sender_public_key_pem)
-            if not sender_pub_key: return False
-
-            sender_pub_key.verify(
-                base64.b64decode(signature_str),
-                message_str.encode('utf-8'),
-                padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH),
-                hashes.SHA256()
-            )
-            return True
+            if isinstance(signature, str):
+                signature = base64.b64decode(signature, validate=True)
+            if isinstance(message, str):
+                message = message.encode('utf-8')
+            signature = bytes(signature)
         except Exception:
             return False
 
+        # A peer may hold one identity per scheme; any of them may have signed.
+        for sender_pub_key in self.get_peer_public_keys(sender_id, sender_public_key_pem):
+            scheme = scheme_for_key(sender_pub_key)
+            if not scheme:
+                continue
+            try:
+                scheme.verify(sender_pub_key, signature, message)
+                return True
+            except Exception:
+                continue
+        return False
+
 class Node:
-    def __init__(self, name: str, network_key: bytes):
+    def __init__(self, name: str, network_key: bytes, scheme: str = None):
         self.name = name
-        self.vault = CryptoVault(name, network_key)
+        self.vault = CryptoVault(name, network_key, scheme)
         self.known_peers = {} 
+        self.clock = time.time
+
+        self.sessions = {}
+        self._peer_sessions = {}
+        self._pending_handshakes = {}
+        self._session_lock = threading.Lock()
 
     def is_timestamp_valid(self, timestamp_str: str) -> bool:
     
         try:
             pkt_time = float(timestamp_str)
-            current_time = time.time()
+            current_time = self.clock()
             
             if abs(current_time - pkt_time) > 10.0:
                 return False
             return True
         except:
-            return False
\ No newline at end of file
+            return False
+
+    def begin_handshake(self, peer_name: str, now: float = None) -> dict:
+        now = self.clock() if now is None else now
+        priv, ephemeral = new_ephemeral()
+        timestamp = str(now)
+        self._pending_handshakes[peer_name] = (priv, ephemeral)
+        return {
+            "sender_id": self.name,
+            "ephemeral": ephemeral,
+            "timestamp": timestamp,
+            "signature": self.vault.sign_message(f"{self.name}|{peer_name}|{ephemeral}|{timestamp}")
+        }
+
+    def accept_handshake(self, hello: dict, sender_public_key_pem: str = None, now: float = None, ttl: float = SESSION_TTL) -> dict:
+        now = self.clock() if now is None else now
+        sender_id = hello["sender_id"]
+
+        if not self.is_timestamp_valid(hello["timestamp"]):
+            return None
+        signed = f"{sender_id}|{self.name}|{hello['ephemeral']}|{hello['timestamp']}"
+        if not self.vault.verify_signature(signed, hello["signature"], sender_id, sender_public_key_pem):
+            return None
+
+        priv, ephemeral = new_ephemeral()
+        session_id = new_session_id()
+        key = derive_session_key(priv, hello["ephemeral"], session_id)
+        self.install_session(SessionKey(session_id, key, sender_id, now, ttl, ttl))
+
+        return {
+            "session_id": session_id,
+            "ephemeral": ephemeral,
+            "ttl": ttl,
+            "signature": self.vault.sign_message(f"{self.name}|{sender_id}|{session_id}|{ephemeral}|{hello['ephemeral']}|{ttl}")
+        }
+
+    def install_session(self, session: SessionKey):
+        with self._session_lock:
+            # The previous session stays valid until it expires so packets already in flight still verify.
+            previous = self._peer_sessions.get(session.peer, [])
+            for stale in previous[:-1]:
+                self.sessions.pop(stale, None)
+            self._peer_sessions[session.peer] = previous[-1:] + [session.session_id]
+            self.sessions[session.session_id] = session
+
+    def complete_handshake(self, peer_name: str, reply: dict, peer_public_key_pem: str, now: float = None, rotate_after: float = SESSION_ROTATE_AFTER) -> SessionKey:
+        now = self.clock() if now is None else now
+        pending = self._pending_handshakes.pop(peer_name, None)
+        if pending is None or not reply:
+            return None
+        priv, own_ephemeral = pending
+
+        signed = f"{peer_name}|{self.name}|{reply['session_id']}|{reply['ephemeral']}|{own_ephemeral}|{reply['ttl']}"
+        if not self.vault.verify_signature(signed, reply["signature"], peer_name, peer_public_key_pem):
+            return None
+
+        key = derive_session_key(priv, reply["ephemeral"], reply["session_id"])
+        session = SessionKey(reply["session_id"], key, peer_name, now, reply["ttl"], rotate_after)
+        self.sessions[peer_name] = session
+        return session
+
+    def get_session(self, session_id: str, peer_name: str, now: float = None) -> SessionKey:
+        now = self.clock() if now is None else now
+        session = self.sessions.get(session_id)
+        if session is None or session.peer != peer_name:
+            return None
+        if session.expired(now):
+            self.sessions.pop(session_id, None)
+            return None
+        return session
@@ -0,0 +1,261 @@
+import glob
+import multiprocessing
+import os
+import struct
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from cryptography.hazmat.primitives import serialization
+
+KEYS_DIR = os.environ.get("CATENATE_KEYS_DIR", "keys")
+KEYSTORE_FILE = "keystore.pack"
+WARM_POOL_SIZE = 16
+
+_MAGIC = b"CUKEYS1\n"
+_RECORD = struct.Struct("<HHII")
+
+class KeyStoreError(ValueError):
+    pass
+
+def _generate_keypair(scheme_name):
+    from .core import SIGNATURE_SCHEMES
+
+    priv = SIGNATURE_SCHEMES[scheme_name].generate()
+    priv_der = priv.private_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+    pub_der = priv.public_key().public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return priv_der, pub_der
+
+def _check_private_key(priv_der):
+    # The full RSA consistency check is the slow part of loading a key we did
+    # not generate, so it runs in the provisioner's worker processes.
+    try:
+        serialization.load_der_private_key(priv_der, password=None)
+        return True
+    except Exception:
+        return False
+
+class PackedKeyStore:
+    # One append-only file of length-prefixed DER records replaces two PEM
+    # files per unit. The whole file is read once; lookups are dict hits.
+    # Records this process generated or fully checked itself are trusted;
+    # only those may skip the RSA consistency check when a unit loads them.
+
+    def __init__(self, keys_dir):
+        self.keys_dir = keys_dir
+        self.path = os.path.join(keys_dir, KEYSTORE_FILE)
+        self._records = {}
+        self._trusted = set()
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self):
+        return len(self._records)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            os.makedirs(self.keys_dir, exist_ok=True)
+            with open(self.path, "wb") as f:
+                f.write(_MAGIC)
+            self.put_many(self._import_pem_dir())
+            return
+
+        with open(self.path, "rb") as f:
+            blob = f.read()
+        if not blob.startswith(_MAGIC):
+            # Appending to a file we cannot parse would bury every new key.
+            raise KeyStoreError(f"{self.path} is not a keystore (bad magic); move it aside to start a new one")
+
+        view = memoryview(blob)
+        offset = len(_MAGIC)
+        while offset + _RECORD.size <= len(blob):
+            name_len, scheme_len, priv_len, pub_len = _RECORD.unpack_from(blob, offset)
+            offset += _RECORD.size
+            end = offset + name_len + scheme_len + priv_len + pub_len
+            if end > len(blob):
+                break
+            name = bytes(view[offset:offset + name_len]).decode('utf-8')
+            offset += name_len
+            scheme = bytes(view[offset:offset + scheme_len]).decode('utf-8')
+            offset += scheme_len
+            priv_der = bytes(view[offset:offset + priv_len])
+            offset += priv_len
+            pub_der = bytes(view[offset:end])
+            offset = end
+            self._records[(name, scheme)] = (priv_der, pub_der)
+
+        if offset < len(blob):
+            # A torn record at the tail (crash mid-append) is cut off so the
+            # next append does not land behind it.
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+
+    def _import_pem_dir(self):
+        from .core import scheme_for_key
+
+        imported = []
+        for priv_path in glob.glob(os.path.join(self.keys_dir, "*_private.pem")):
+            pub_path = priv_path[:-len("_private.pem")] + "_public.pem"
+            if not os.path.exists(pub_path):
+                continue
+            try:
+                with open(priv_path, "rb") as f:
+                    priv = serialization.load_pem_private_key(f.read(), password=None)
+                with open(pub_path, "rb") as f:
+                    pub = serialization.load_pem_public_key(f.read())
+            except Exception:
+                continue
+
+            scheme = scheme_for_key(priv)
+            if scheme is None:
+                continue
+            name = os.path.basename(priv_path)[:-len("_private.pem")]
+            if scheme.key_suffix and name.endswith(scheme.key_suffix):
+                name = name[:-len(scheme.key_suffix)]
+
+            imported.append((name, scheme.name,
+                priv.private_bytes(
+                    encoding=serialization.Encoding.DER,
+                    format=serialization.PrivateFormat.PKCS8,
+                    encryption_algorithm=serialization.NoEncryption()
+                ),
+                pub.public_bytes(
+                    encoding=serialization.Encoding.DER,
+                    format=serialization.PublicFormat.SubjectPublicKeyInfo
+                )))
+        return imported
+
+    def get(self, name, scheme):
+        return self._records.get((name, scheme))
+
+    def trusted(self, name, scheme):
+        return (name, scheme) in self._trusted
+
+    def trust(self, keys):
+        with self._lock:
+            self._trusted.update(keys)
+
+    def items(self):
+        return list(self._records.items())
+
+    def put(self, name, scheme, priv_der, pub_der, trusted=False):
+        self.put_many([(name, scheme, priv_der, pub_der)], trusted)
+
+    def put_many(self, entries, trusted=False):
+        if not entries:
+            return
+        chunks = []
+        for name, scheme, priv_der, pub_der in entries:
+            name_b, scheme_b = name.encode('utf-8'), scheme.encode('utf-8')
+            chunks.append(_RECORD.pack(len(name_b), len(scheme_b), len(priv_der), len(pub_der)))
+            chunks.extend((name_b, scheme_b, priv_der, pub_der))
+        with self._lock:
+            with open(self.path, "ab") as f:
+                f.write(b"".join(chunks))
+            for name, scheme, priv_der, pub_der in entries:
+                self._records[(name, scheme)] = (priv_der, pub_der)
+                if trusted:
+                    self._trusted.add((name, scheme))
+                else:
+                    self._trusted.discard((name, scheme))
+
+class KeyProvisioner:
+    def __init__(self, pool_size=WARM_POOL_SIZE, workers=None):
+        self.pool_size = pool_size
+        self.workers = workers or os.cpu_count() or 1
+        self._warm = {}
+        self._pending = {}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def warm_count(self, scheme):
+        return len(self._warm.get(scheme, ()))
+
+    def take(self, scheme):
+        warm = self._warm.setdefault(scheme, deque())
+        try:
+            keypair = warm.popleft()
+        except IndexError:
+            keypair = _generate_keypair(scheme)
+        self.refill(scheme)
+        return keypair
+
+    def generate(self, scheme, count):
+        keypairs = []
+        warm = self._warm.setdefault(scheme, deque())
+        try:
+            while len(keypairs) < count:
+                keypairs.append(warm.popleft())
+        except IndexError:
+            pass
+        missing = count - len(keypairs)
+        if missing > 0:
+            keypairs.extend(self._pool().map(_generate_keypair, [scheme] * missing, chunksize=max(1, missing // (self.workers * 4))))
+        self.refill(scheme)
+        return keypairs
+
+    def refill(self, scheme):
+        warm = self._warm.setdefault(scheme, deque())
+        with self._lock:
+            pending = self._pending.get(scheme, 0)
+            missing = self.pool_size - len(warm) - pending
+            if missing <= 0:
+                return
+            self._pending[scheme] = pending + missing
+
+        pool = self._pool()
+        for _ in range(missing):
+            pool.submit(_generate_keypair, scheme).add_done_callback(partial(self._stock, scheme))
+
+    def _stock(self, scheme, future):
+        with self._lock:
+            self._pending[scheme] -= 1
+        try:
+            self._warm[scheme].append(future.result())
+        except Exception:
+            pass
+
+    def check(self, priv_ders):
+        if not priv_ders:
+            return []
+        return list(self._pool().map(_check_private_key, priv_ders, chunksize=max(1, len(priv_ders) // (self.workers * 4))))
+
+    def provision(self, store, names, scheme):
+        # Stored keys from earlier runs or imports are checked in bulk here
+        # rather than one by one as units load them; bad ones are replaced.
+        unchecked = [name for name in names if store.get(name, scheme) is not None and not store.trusted(name, scheme)]
+        verdicts = self.check([store.get(name, scheme)[0] for name in unchecked])
+        store.trust((name, scheme) for name, ok in zip(unchecked, verdicts) if ok)
+        missing = [name for name in names if not store.trusted(name, scheme)]
+        if not missing:
+            return 0
+        keypairs = self.generate(scheme, len(missing))
+        store.put_many([(name, scheme, priv_der, pub_der) for name, (priv_der, pub_der) in zip(missing, keypairs)], trusted=True)
+        return len(missing)
+
+_STORES = {}
+_STORES_LOCK = threading.Lock()
+KEY_PROVISIONER = KeyProvisioner()
+
+def get_keystore(keys_dir):
+    with _STORES_LOCK:
+        store = _STORES.get(keys_dir)
+        if store is None:
+            store = _STORES[keys_dir] = PackedKeyStore(keys_dir)
+        return store
@@ -1,28 +1,26 @@
-import time
+from cryptography.hazmat.primitives import serialization
 from .core import Node
 
 class OptimizedNode(Node):
+    # known_peers stays the source of truth (PEM text); the vault's
+    # PeerKeyDirectory holds the parsed keys and refreshes them from it.
 
-    def __init__(self, name, network_key):
-        
-        self._cached_peers = {}
-        self._last_peer_refresh = 0
-        self._refresh_interval = 10 
-        super().__init__(name, network_key) 
-    
-    def _load_peers(self):
+    def __init__(self, name, network_key, scheme=None, peer_loader=None):
+        super().__init__(name, network_key, scheme)
+        self.vault.peers.loader = peer_loader or self._load_peer
 
-        current_time = time.time()
-        if current_time - self._last_peer_refresh > self._refresh_interval:
-            super()._load_peers() 
-            
-            self._cached_peers = self.known_peers.copy()
-            self._last_peer_refresh = current_time
-        else:
+    def _load_peer(self, node_id):
+        pem = self.known_peers.get(node_id)
+        if not pem:
+            return None
+        try:
+            return (serialization.load_pem_public_key(pem.encode('utf-8')),)
+        except Exception:
+            return None
 
-            self.known_peers = self._cached_peers
+    def preload_peers(self, keys_dir=None):
+        return self.vault.peers.preload(keys_dir or self.vault.keys_dir)
 
     def get_peer_key(self, node_id):
-
-        self._load_peers()
-        return self.known_peers.get(node_id)
\ No newline at end of file
+        keys = self.vault.peers.get(node_id)
+        return keys[0] if keys else None
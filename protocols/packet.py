@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+class DataPacket(BaseModel):
+    sender_id: str
+    timestamp: str 
+    encrypted_payload: str
+    signature: str
+    session_id: str = ""
+    
+    def to_json(self):
+        return self.model_dump_json()
@@ -0,0 +1,117 @@
+import glob
+import heapq
+import os
+import threading
+import time
+from cryptography.hazmat.primitives import serialization
+
+PEER_TTL = 300.0
+PEER_CAPACITY = 16384
+
+def scan_public_keys(keys_dir):
+    # Every identity on disk, grouped by unit name: packed keystore records
+    # first, then any *_public.pem the keystore does not already cover.
+    from .core import SIGNATURE_SCHEMES
+    from .keystore import get_keystore
+
+    found = {}
+    seen = set()
+    for (name, _), (_, pub_der) in get_keystore(keys_dir).items():
+        try:
+            found.setdefault(name, []).append(serialization.load_der_public_key(pub_der))
+            seen.add(pub_der)
+        except Exception:
+            continue
+
+    suffixes = [s.key_suffix for s in SIGNATURE_SCHEMES.values() if s.key_suffix]
+    for path in glob.glob(os.path.join(keys_dir, "*_public.pem")):
+        name = os.path.basename(path)[:-len("_public.pem")]
+        for suffix in suffixes:
+            if name.endswith(suffix):
+                name = name[:-len(suffix)]
+        try:
+            with open(path, "rb") as f:
+                key = serialization.load_pem_public_key(f.read())
+        except Exception:
+            continue
+        der = key.public_bytes(
+            encoding=serialization.Encoding.DER,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        if der not in seen:
+            seen.add(der)
+            found.setdefault(name, []).append(key)
+    return found
+
+class PeerKeyDirectory:
+    # Parsed public keys per peer (a peer may hold one identity per scheme).
+    # The read path is a bare dict lookup plus a timestamp write, so hub
+    # workers never take a lock; misses, TTL refreshes and LRU eviction go
+    # through the slow path. Hit/miss counters are best-effort.
+
+    def __init__(self, loader=None, ttl=PEER_TTL, capacity=PEER_CAPACITY, clock=time.monotonic):
+        self.loader = loader
+        self.ttl = ttl
+        self.capacity = capacity
+        self.clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, peer_id):
+        now = self.clock()
+        entry = self._entries.get(peer_id)
+        if entry is not None and entry[1] > now:
+            entry[2] = now
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+
+        keys = self.loader(peer_id) if self.loader else None
+        if keys:
+            self.put(peer_id, keys)
+            return tuple(keys)
+        if entry is not None:
+            # Expired and the source no longer knows the peer.
+            self.invalidate(peer_id)
+        return ()
+
+    def put(self, peer_id, keys):
+        self.put_many({peer_id: keys})
+
+    def put_many(self, entries):
+        now = self.clock()
+        with self._lock:
+            for peer_id, keys in entries.items():
+                self._entries[peer_id] = [tuple(keys), now + self.ttl, now]
+            overflow = len(self._entries) - self.capacity
+            if overflow > 0:
+                # Evict in batches (a tenth of capacity) so a full directory
+                # does not pay for a scan on every insert.
+                batch = overflow + self.capacity // 10
+                victims = heapq.nsmallest(batch, self._entries.items(), key=lambda item: item[1][2])
+                for peer_id, _ in victims:
+                    del self._entries[peer_id]
+                self.evictions += len(victims)
+
+    def preload(self, keys_dir):
+        found = scan_public_keys(keys_dir)
+        self.put_many(found)
+        return len(found)
+
+    def invalidate(self, peer_id):
+        with self._lock:
+            self._entries.pop(peer_id, None)
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,90 @@
+import hashlib
+import math
+import threading
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, digest):
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def __contains__(self, digest):
+        array = self._array
+        return all(array[p >> 3] & (1 << (p & 7)) for p in self._positions(digest))
+
+    def add(self, digest):
+        array = self._array
+        for p in self._positions(digest):
+            array[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def clear(self):
+        self._array[:] = bytes(len(self._array))
+        self.count = 0
+
+    @property
+    def nbytes(self):
+        return len(self._array)
+
+class ReplayGuard:
+    # A ring of Bloom filters, one per slice of the replay window. Arrivals are
+    # recorded in the current slice and checked against all of them; the oldest
+    # slice is wiped as time moves on, so memory never grows with packet rate.
+
+    def __init__(self, window=20.0, slices=4, capacity_per_slice=65536, error_rate=0.001):
+        self.slice_width = window / slices
+        self._filters = [BloomFilter(capacity_per_slice, error_rate) for _ in range(slices)]
+        self._slice_ids = [None] * slices
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.duplicates = 0
+
+    @staticmethod
+    def digest(sender_id, signature):
+        # The header timestamp is not covered by the signature, so it stays
+        # out of the digest: re-stamping a captured packet must not make it new.
+        h = hashlib.blake2b(digest_size=16)
+        h.update(sender_id.encode('utf-8'))
+        h.update(b"|")
+        h.update(signature.encode('utf-8') if isinstance(signature, str) else signature)
+        return h.digest()
+
+    def seen(self, sender_id, timestamp, signature, now):
+        digest = self.digest(sender_id, signature)
+        slices = len(self._filters)
+        current = int(now // self.slice_width)
+        # The timestamp only picks the slice the digest is filed under, held
+        # inside the live ring so a far-off stamp can't file it early or late.
+        try:
+            stamped = int(float(timestamp) // self.slice_width)
+        except (TypeError, ValueError, OverflowError):
+            stamped = current
+        slice_id = min(current, max(current - slices + 1, stamped))
+        slot = slice_id % slices
+
+        with self._lock:
+            self.checked += 1
+            for filt, sid in zip(self._filters, self._slice_ids):
+                if sid is not None and current - sid < slices and digest in filt:
+                    self.duplicates += 1
+                    return True
+
+            if self._slice_ids[slot] != slice_id:
+                self._filters[slot].clear()
+                self._slice_ids[slot] = slice_id
+            self._filters[slot].add(digest)
+            return False
+
+    def stats(self):
+        return {
+            "checked": self.checked,
+            "duplicates": self.duplicates,
+            "memory_bytes": sum(f.nbytes for f in self._filters),
+            "tracked": sum(f.count for f in self._filters),
+        }
@@ -0,0 +1,76 @@
+import base64
+import hashlib
+import hmac
+import secrets
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import x25519
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+SESSION_TTL = 300.0
+SESSION_ROTATE_AFTER = 240.0
+
+class SessionKey:
+    def __init__(self, session_id: str, key: bytes, peer: str, created: float, ttl: float = SESSION_TTL, rotate_after: float = SESSION_ROTATE_AFTER):
+        self.session_id = session_id
+        self.peer = peer
+        self.created = created
+        self.expires_at = created + ttl
+        self.rotate_at = created + min(rotate_after, ttl)
+        self._key = key
+
+    def export(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "key": base64.b64encode(self._key).decode('utf-8'),
+            "peer": self.peer,
+            "created": self.created,
+            "ttl": self.expires_at - self.created,
+            "rotate_after": self.rotate_at - self.created,
+        }
+
+    @classmethod
+    def restore(cls, state: dict) -> "SessionKey":
+        return cls(state["session_id"], base64.b64decode(state["key"]), state["peer"], state["created"], state["ttl"], state["rotate_after"])
+
+    def expired(self, now: float) -> bool:
+        return now >= self.expires_at
+
+    def needs_rotation(self, now: float) -> bool:
+        return now >= self.rotate_at
+
+    def sign(self, message_str: str) -> str:
+        return base64.b64encode(self.sign_bytes(message_str.encode('utf-8'))).decode('utf-8')
+
+    def sign_bytes(self, message: bytes) -> bytes:
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def verify(self, message, tag) -> bool:
+        try:
+            if isinstance(tag, str):
+                tag = base64.b64decode(tag, validate=True)
+            if isinstance(message, str):
+                message = message.encode('utf-8')
+        except Exception:
+            return False
+        return hmac.compare_digest(self.sign_bytes(message), bytes(tag))
+
+def new_ephemeral():
+    priv = x25519.X25519PrivateKey.generate()
+    pub = priv.public_key().public_bytes(
+        encoding=serialization.Encoding.Raw,
+        format=serialization.PublicFormat.Raw
+    )
+    return priv, base64.b64encode(pub).decode('utf-8')
+
+def new_session_id() -> str:
+    return secrets.token_hex(8)
+
+def derive_session_key(ephemeral_priv, peer_ephemeral_b64: str, session_id: str) -> bytes:
+    peer_pub = x25519.X25519PublicKey.from_public_bytes(base64.b64decode(peer_ephemeral_b64))
+    shared = ephemeral_priv.exchange(peer_pub)
+    return HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=session_id.encode('utf-8'),
+        info=b"catenate-session-mac"
+    ).derive(shared)
@@ -0,0 +1,100 @@
+import base64
+import struct
+
+# Frame layout (little endian):
+#   magic "CU" | version u8 | flags u8 | sender index u32 | timestamp f64
+#   | ciphertext len u32 | signature len u16 | [session id, 8 bytes]
+#   | raw ciphertext | raw signature
+# The ciphertext is the Fernet token with its base64 armour stripped.
+
+MAGIC = b"CU"
+VERSION = 1
+FLAG_SESSION = 0x01
+SESSION_ID_BYTES = 8
+
+_HEADER = struct.Struct("<2sBBIdIH")
+_TIMESTAMP_OFFSET = 8
+
+class FrameError(ValueError):
+    pass
+
+class WirePacket:
+    __slots__ = ("sender_id", "sender_index", "timestamp", "session_id", "_ciphertext", "signature", "_token")
+
+    def __init__(self, sender_id, sender_index, timestamp, ciphertext, signature, session_id=""):
+        self.sender_id = sender_id
+        self.sender_index = sender_index
+        self.timestamp = timestamp
+        self.session_id = session_id
+        self._ciphertext = ciphertext
+        self.signature = signature
+        self._token = None
+
+    @property
+    def encrypted_payload(self) -> bytes:
+        # Signatures and Fernet both work on the armoured token, so rebuild it once.
+        if self._token is None:
+            self._token = base64.urlsafe_b64encode(self._ciphertext)
+        return self._token
+
+    def to_json(self):
+        from .packet import DataPacket
+
+        return DataPacket(
+            sender_id=self.sender_id,
+            timestamp=str(self.timestamp),
+            encrypted_payload=self.encrypted_payload.decode('utf-8'),
+            signature=base64.b64encode(self.signature).decode('utf-8'),
+            session_id=self.session_id
+        ).to_json()
+
+def encode_frame(sender_index: int, timestamp: float, token: bytes, signature: bytes, session_id: str = "") -> bytes:
+    ciphertext = base64.urlsafe_b64decode(token)
+    flags = FLAG_SESSION if session_id else 0
+    parts = [_HEADER.pack(MAGIC, VERSION, flags, sender_index, timestamp, len(ciphertext), len(signature))]
+    if session_id:
+        parts.append(bytes.fromhex(session_id))
+    parts.append(ciphertext)
+    parts.append(signature)
+    return b"".join(parts)
+
+def peek_sender_index(frame) -> int:
+    # Routing only needs the sender, so skip the full decode.
+    if len(frame) < _HEADER.size:
+        raise FrameError("short frame")
+    magic, version, _, sender_index = struct.unpack_from("<2sBBI", frame)
+    if magic != MAGIC or version != VERSION:
+        raise FrameError("bad magic or version")
+    return sender_index
+
+def frame_timestamp(frame) -> float:
+    return struct.unpack_from("<d", frame, _TIMESTAMP_OFFSET)[0]
+
+def restamp_frame(frame, timestamp: float) -> bytes:
+    # The timestamp is not covered by the signature, so a captured frame can
+    # be re-dated without touching the crypto.
+    out = bytearray(frame)
+    struct.pack_into("<d", out, _TIMESTAMP_OFFSET, timestamp)
+    return bytes(out)
+
+def decode_frame(frame, resolve_sender) -> WirePacket:
+    view = memoryview(frame)
+    if len(view) < _HEADER.size:
+        raise FrameError("short frame")
+
+    magic, version, flags, sender_index, timestamp, ct_len, sig_len = _HEADER.unpack_from(view)
+    if magic != MAGIC or version != VERSION:
+        raise FrameError("bad magic or version")
+
+    offset = _HEADER.size
+    session_id = ""
+    if flags & FLAG_SESSION:
+        session_id = view[offset:offset + SESSION_ID_BYTES].hex()
+        offset += SESSION_ID_BYTES
+
+    if offset + ct_len + sig_len != len(view):
+        raise FrameError("length mismatch")
+
+    ciphertext = view[offset:offset + ct_len]
+    signature = view[offset + ct_len:]
+    return WirePacket(resolve_sender(sender_index), sender_index, timestamp, ciphertext, signature, session_id)
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from kernel.checkpoint import CheckpointError, checkpoint_key, read_checkpoint, write_checkpoint
+
+def save(tmp_path, key):
+    path = str(tmp_path / "fleet.npz")
+    columns = {"x": np.array([1.0, 2.0]), "battery": np.array([90.0, 80.0])}
+    identities = [("ed25519", b"priv-a", b"pub-a"), ("ed25519", b"priv-b", b"pub-b")]
+    write_checkpoint(path, {"network_key": "k"}, ["Unit-01", "Unit-02"], columns, identities, key)
+    return path
+
+def test_round_trip(tmp_path):
+    key = checkpoint_key(str(tmp_path / "keys"))
+    assert checkpoint_key(str(tmp_path / "keys")) == key
+    meta, ids, columns, identities = read_checkpoint(save(tmp_path, key), key)
+    assert ids == ["Unit-01", "Unit-02"]
+    assert columns["battery"].tolist() == [90.0, 80.0]
+    assert identities[1] == ("ed25519", b"priv-b", b"pub-b")
+
+def test_tampered_or_foreign_checkpoint_is_refused(tmp_path):
+    key = checkpoint_key(str(tmp_path / "keys"))
+    path = save(tmp_path, key)
+    with pytest.raises(CheckpointError):
+        read_checkpoint(path, checkpoint_key(str(tmp_path / "other")))
+
+    arrays = dict(np.load(path))
+    arrays["fleet_battery"] = arrays["fleet_battery"] + 1
+    np.savez(path, **arrays)
+    with pytest.raises(CheckpointError):
+        read_checkpoint(path, key)
@@ -0,0 +1,31 @@
+import numpy as np
+from kernel.fleet_store import FleetStore
+
+def test_idle_tick_keeps_version():
+    fleet = FleetStore()
+    fleet.add("Unit-01", 3.0, 4.0)
+    rng = np.random.default_rng(0)
+    fleet.tick(1.0, 15.0, 1.0, False, rng)
+    version = fleet.version
+    fleet.tick(1.0, 15.0, 1.0, False, rng)
+    assert fleet.version == version
+
+def test_tick_bumps_version_on_change():
+    fleet = FleetStore()
+    fleet.add("Unit-01", 3.0, 4.0)
+    rng = np.random.default_rng(0)
+    fleet.tick(1.0, 15.0, 1.0, False, rng)
+
+    version = fleet.version
+    fleet.tick(1.0, 4.0, 1.0, False, rng)
+    assert fleet.version > version and not fleet.in_range[0]
+
+    version = fleet.version
+    fleet.tx_count[0] = 1
+    fleet.tick(1.0, 4.0, 1.0, False, rng)
+    assert fleet.version > version and fleet.battery[0] < 100.0
+
+    version = fleet.version
+    fleet.battery[0] = 0.0
+    fleet.tick(1.0, 4.0, 1.0, False, rng)
+    assert fleet.version > version and not fleet.alive[0]
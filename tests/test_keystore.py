@@ -0,0 +1,29 @@
+import os
+import pytest
+from protocols.keystore import KEYSTORE_FILE, KeyStoreError, PackedKeyStore
+
+def test_torn_tail_is_truncated_before_appending(tmp_path):
+    store = PackedKeyStore(str(tmp_path))
+    store.put("Unit-01", "rsa-pss", b"priv1", b"pub1")
+    with open(os.path.join(tmp_path, KEYSTORE_FILE), "ab") as f:
+        f.write(b"\x07\x00\x07\x00\xff\xff")
+
+    store = PackedKeyStore(str(tmp_path))
+    store.put("Unit-02", "rsa-pss", b"priv2", b"pub2")
+    reloaded = PackedKeyStore(str(tmp_path))
+    assert reloaded.get("Unit-01", "rsa-pss") == (b"priv1", b"pub1")
+    assert reloaded.get("Unit-02", "rsa-pss") == (b"priv2", b"pub2")
+
+def test_bad_magic_raises(tmp_path):
+    with open(os.path.join(tmp_path, KEYSTORE_FILE), "wb") as f:
+        f.write(b"not a keystore")
+    with pytest.raises(KeyStoreError):
+        PackedKeyStore(str(tmp_path))
+
+def test_only_generated_records_are_trusted(tmp_path):
+    store = PackedKeyStore(str(tmp_path))
+    store.put("Unit-01", "rsa-pss", b"priv1", b"pub1", trusted=True)
+    store.put_many([("Unit-02", "rsa-pss", b"priv2", b"pub2")])
+    assert store.trusted("Unit-01", "rsa-pss")
+    assert not store.trusted("Unit-02", "rsa-pss")
+    assert not PackedKeyStore(str(tmp_path)).trusted("Unit-01", "rsa-pss")
@@ -0,0 +1,29 @@
+import os
+from kernel.log_store import STRINGS_FILE, LogStore
+
+def reopen(store, log_dir):
+    store._strings_file.close()
+    return LogStore(str(log_dir))
+
+def fields(store):
+    return [(e["ID"], e["Type"], e["Status"]) for e in store.query()]
+
+def test_control_characters_survive_reload(tmp_path):
+    store = LogStore(str(tmp_path))
+    store.append(1.0, "Unit-01", "EVIL\rTYPE\nX", "p1", "VERIFIED")
+    store.append(2.0, "Unit-02", "CHAT", "p2", "BLOCKED")
+    store.flush()
+    assert fields(reopen(store, tmp_path)) == [("Unit-02", "CHAT", "BLOCKED"), ("Unit-01", "EVIL\rTYPE\nX", "VERIFIED")]
+
+def test_torn_string_entry_is_truncated(tmp_path):
+    store = LogStore(str(tmp_path))
+    store.append(1.0, "Unit-01", "CHAT", "p1", "VERIFIED")
+    store.flush()
+    store._strings_file.close()
+    with open(os.path.join(tmp_path, STRINGS_FILE), "ab") as f:
+        f.write(b"\x09\x00\x00\x00ab")
+
+    store = LogStore(str(tmp_path))
+    store.append(2.0, "Unit-02", "BIO", "p2", "CRITICAL")
+    store.flush()
+    assert fields(reopen(store, tmp_path)) == [("Unit-02", "BIO", "CRITICAL"), ("Unit-01", "CHAT", "VERIFIED")]
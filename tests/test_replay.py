@@ -0,0 +1,45 @@
+from protocols.replay import ReplayGuard
+
+def test_restamped_packet_is_a_replay():
+    guard = ReplayGuard()
+    assert not guard.seen("Unit-01", "100.0", "sig-a", 100.0)
+    assert guard.seen("Unit-01", "103.5", "sig-a", 104.0)
+    assert not guard.seen("Unit-01", "104.0", "sig-b", 104.0)
+    assert not guard.seen("Unit-02", "104.0", "sig-a", 104.0)
+
+def test_digest_expires_with_its_slice():
+    guard = ReplayGuard(window=20.0, slices=4)
+    assert not guard.seen("Unit-01", "100.0", "sig-a", 100.0)
+    assert guard.seen("Unit-01", "100.0", "sig-a", 114.0)
+    assert not guard.seen("Unit-01", "121.0", "sig-a", 121.0)
+
+def test_future_stamp_is_filed_under_now():
+    guard = ReplayGuard(window=20.0, slices=4)
+    assert not guard.seen("Unit-01", "1000.0", "sig-a", 100.0)
+    assert guard.seen("Unit-01", "100.0", "sig-a", 101.0)
+
+def test_frame_resent_as_json_is_a_replay(tmp_path, monkeypatch):
+    import base64
+    import time
+    from cryptography.fernet import Fernet
+    from protocols import core
+    from protocols.packet import DataPacket
+    from protocols.wire import encode_frame
+    from kernel.rules import RULES_PATH
+    from kernel.shards import FRAME, PACKET, HubCore, peer_message
+
+    monkeypatch.setattr(core, "KEYS_DIR", str(tmp_path))
+    network_key = Fernet.generate_key()
+    hub = HubCore(network_key, "ed25519", RULES_PATH)
+    scheme = core.SIGNATURE_SCHEMES["ed25519"]
+    key = scheme.generate()
+    hub.handle(*peer_message("Unit-01", 0, key.public_key()))
+
+    token = Fernet(network_key).encrypt(b'{"type": "CHAT", "content": "hello"}')
+    sig = scheme.sign(key, token)
+    now = time.time()
+    text = base64.b64encode(sig).decode("ascii")
+    assert hub.handle(FRAME, encode_frame(0, now, token, sig)) == [["CHAT", "hello", "VERIFIED", "Unit-01"]]
+    for signature, verdict in ((text, "Replay Detected"), (text[:8] + "!" + text[8:], "Malformed Packet")):
+        packet = DataPacket(sender_id="Unit-01", timestamp=str(now), encrypted_payload=token.decode("ascii"), signature=signature)
+        assert hub.handle(PACKET, packet.to_json().encode("utf-8"))[0][1] == verdict
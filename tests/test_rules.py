@@ -0,0 +1,35 @@
+import json
+import pytest
+from kernel.rules import RuleEngine
+
+def engine(tmp_path, specs):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(specs))
+    return RuleEngine(str(path))
+
+def test_overlapping_literals_first_rule_wins(tmp_path):
+    rules = engine(tmp_path, [{"name": "R0", "patterns": ["BCD"]}, {"name": "R1", "patterns": ["ABC"]}])
+    assert rules.classify("CHAT", "xxABCDxx").name == "R0"
+
+def test_regex_beats_later_literal_at_same_position(tmp_path):
+    rules = engine(tmp_path, [{"name": "R0", "regex": ["FALSE FLAG"]}, {"name": "R1", "patterns": ["FALSE"]}])
+    assert rules.classify("INTEL", "FALSE FLAG here").name == "R0"
+
+@pytest.mark.parametrize("content, expected", [
+    ("she said hershey", "R0"),
+    ("ushers", "R0"),
+    ("his", "R1"),
+    ("nothing to see", None),
+])
+def test_suffix_literals(tmp_path, content, expected):
+    rules = engine(tmp_path, [
+        {"name": "R0", "patterns": ["he", "hers"]},
+        {"name": "R1", "patterns": ["his", "she"]},
+    ])
+    rule = rules.classify("CHAT", content)
+    assert (rule.name if rule else None) == expected
+
+def test_types_limit_rules(tmp_path):
+    rules = engine(tmp_path, [{"name": "R0", "patterns": ["GHOST"], "types": ["BIO"]}])
+    assert rules.classify("BIO", "STATUS: GHOST").name == "R0"
+    assert rules.classify("CHAT", "STATUS: GHOST") is None